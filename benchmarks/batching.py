@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+
+"""
+Compares vertex creation throughput through unary `create_vertex` calls and
+through a `WriteBatcher`.
+
+Run against a live server, e.g.:
+
+    INDRADB_HOST=localhost:27615 ./benchmarks/batching.py --count 20000
+"""
+
+import os
+import sys
+import time
+import uuid
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from indradb import Client, Vertex, WriteBatcher
+
+def unary(client, count):
+    start = time.monotonic()
+    for _ in range(count):
+        client.create_vertex(Vertex(uuid.uuid4(), "bench"))
+    return count / (time.monotonic() - start)
+
+def batched(client, count, max_items, max_delay):
+    start = time.monotonic()
+    with WriteBatcher(client, max_items=max_items, max_delay=max_delay) as batcher:
+        for _ in range(count):
+            batcher.create_vertex(Vertex(uuid.uuid4(), "bench"))
+    return count / (time.monotonic() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default=os.environ.get("INDRADB_HOST", "localhost:27615"))
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--max-items", type=int, default=1000)
+    parser.add_argument("--max-delay", type=float, default=0.01)
+    args = parser.parse_args()
+
+    with Client(args.host) as client:
+        print("{:>10} {:>12}".format("mode", "writes/sec"))
+        print("{:>10} {:>12.0f}".format("unary", unary(client, args.count)))
+        print("{:>10} {:>12.0f}".format("batched", batched(client, args.count, args.max_items, args.max_delay)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+"""
+Measures how request throughput scales with the size of the client's channel
+pool.
+
+Run against a live server, e.g.:
+
+    INDRADB_HOST=localhost:27615 ./benchmarks/pool.py --threads 64 --seconds 5
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from indradb import Client, SpecificVertexQuery, ROUND_ROBIN, LEAST_OUTSTANDING
+
+def run(client, query, threads, seconds):
+    """Issues `query` from `threads` threads for `seconds`, returning ops/sec."""
+
+    counts = [0] * threads
+    deadline = time.monotonic() + seconds
+
+    def worker(i):
+        while time.monotonic() < deadline:
+            for _ in client.get(query):
+                pass
+            counts[i] += 1
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.monotonic()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return sum(counts) / (time.monotonic() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default=os.environ.get("INDRADB_HOST", "localhost:27615"))
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--sizes", default="1,2,4,8")
+    args = parser.parse_args()
+
+    setup = Client(args.host)
+    id = setup.create_vertex_from_type("bench")
+    query = SpecificVertexQuery(id)
+    setup.close()
+
+    print("{:>10} {:>20} {:>12}".format("channels", "balancing", "ops/sec"))
+    for size in (int(s) for s in args.sizes.split(",")):
+        for balancing in (ROUND_ROBIN, LEAST_OUTSTANDING):
+            with Client(args.host, channels=size, balancing=balancing) as client:
+                ops = run(client, query, args.threads, args.seconds)
+            print("{:>10} {:>20} {:>12.0f}".format(size, balancing, ops))
+
+if __name__ == "__main__":
+    main()
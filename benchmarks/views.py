@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+"""
+Compares eagerly decoding `Get` results into models with wrapping them in
+lazy views, on synthetic edge results. No server is needed.
+
+    ./benchmarks/views.py --edges 1000000
+"""
+
+import os
+import sys
+import time
+import uuid
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from indradb import proto, Edge
+from indradb.client import _decode_chunk
+
+def make_chunks(edges, chunk_size):
+    chunks = []
+    for start in range(0, edges, chunk_size):
+        chunks.append(proto.QueryOutputValue(edges=proto.QueryOutputEdges(edges=[
+            Edge(uuid.uuid4(), "t{}".format(i % 8), uuid.uuid4()).to_message()
+            for i in range(start, min(start + chunk_size, edges))
+        ])))
+    return chunks
+
+def workloads():
+    yield "count", lambda items: len(items)
+    yield "filter by type", lambda items: sum(1 for e in items if e.t == "t0")
+    yield "read all ids", lambda items: sum(1 for e in items if e.outbound_id and e.inbound_id)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--edges", type=int, default=1000000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    chunks = make_chunks(args.edges, args.chunk_size)
+
+    print("{:>16} {:>10} {:>10}".format("workload", "eager (s)", "lazy (s)"))
+    for name, workload in workloads():
+        timings = []
+        for lazy in (False, True):
+            start = time.monotonic()
+            for chunk in chunks:
+                workload(_decode_chunk(chunk, lazy))
+            timings.append(time.monotonic() - start)
+        print("{:>16} {:>10.2f} {:>10.2f}".format(name, *timings))
+
+if __name__ == "__main__":
+    main()
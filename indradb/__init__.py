@@ -1,7 +1,16 @@
 import indradb.indradb_pb2 as proto
 import indradb.indradb_pb2_grpc as grpc
 
-from indradb.client import Client, BulkInserter
+from indradb.client import Client, AsyncClient, ResultStream, BulkInserter, \
+    BulkInsertStats, BulkInsertReport, ROUND_ROBIN, LEAST_OUTSTANDING
+from indradb.codec import JsonCodec, OrjsonCodec
+from indradb.prepared import Param, PreparedQuery, BoundQuery
+from indradb.cache import ResultCache
+from indradb.batching import WriteBatcher
+from indradb.traversal import Neighborhood, neighborhood, shortest_path, random_walks, \
+    write_walks
+from indradb.graph import CSRGraph, snapshot, degrees
+from indradb.scan import VertexCursor, partition_bounds, scan_range, scan_partitions, scan_vertices
 from indradb.models import Edge, Vertex, AllVertexQuery, RangeVertexQuery, \
     SpecificVertexQuery, VertexWithPropertyPresenceQuery, \
     VertexWithPropertyValueQuery, AllEdgeQuery, SpecificEdgeQuery, \
@@ -9,13 +18,40 @@ from indradb.models import Edge, Vertex, AllVertexQuery, RangeVertexQuery, \
     PipePropertyQuery, PipeWithPropertyPresenceQuery, \
     PipeWithPropertyValueQuery, IncludeQuery, CountQuery, EdgeDirection, \
     NamedProperty, VertexProperty, VertexProperties, EdgeProperty, \
-    EdgeProperties
+    EdgeProperties, VertexView, EdgeView, VertexPropertiesView, \
+    EdgePropertiesView
 
 __all__ = [
     "proto",
     "grpc",
     "Client",
+    "AsyncClient",
+    "ResultStream",
     "BulkInserter",
+    "BulkInsertStats",
+    "BulkInsertReport",
+    "ROUND_ROBIN",
+    "LEAST_OUTSTANDING",
+    "JsonCodec",
+    "OrjsonCodec",
+    "Param",
+    "PreparedQuery",
+    "BoundQuery",
+    "ResultCache",
+    "WriteBatcher",
+    "VertexCursor",
+    "partition_bounds",
+    "scan_range",
+    "scan_partitions",
+    "scan_vertices",
+    "Neighborhood",
+    "neighborhood",
+    "shortest_path",
+    "random_walks",
+    "write_walks",
+    "CSRGraph",
+    "snapshot",
+    "degrees",
     "Edge",
     "Vertex",
     "AllVertexQuery",
@@ -39,4 +75,8 @@ __all__ = [
     "VertexProperties",
     "EdgeProperty",
     "EdgeProperties",
+    "VertexView",
+    "EdgeView",
+    "VertexPropertiesView",
+    "EdgePropertiesView",
 ]
@@ -0,0 +1,181 @@
+"""
+Write-behind batching of individual writes into `BulkInsert` calls.
+
+    with WriteBatcher(client, max_items=1000, max_delay=0.005) as batcher:
+        for event in events:
+            batcher.create_vertex(Vertex(event.id, "event"))
+        # everything is written once the block exits
+
+Each write returns a `concurrent.futures.Future` that resolves once the
+batch holding it has been inserted, or fails with the batch's error.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from indradb import proto
+from indradb.client import _vertex_property_item, _edge_property_item
+from indradb.models import SpecificVertexQuery, SpecificEdgeQuery
+
+# Queue entry that stops the flusher thread
+_STOP = object()
+
+class WriteBatcher:
+    """
+    Gathers vertex, edge and property writes and sends them in batches over
+    `BulkInsert` streams from a background thread.
+
+    A batch is sent once it holds `max_items` writes, or `max_delay` seconds
+    after its first write, whichever comes first. Writes are applied in the
+    order they were made.
+
+    Bulk inserts skip the server's usual checks: creating a vertex or edge
+    that already exists overwrites it rather than reporting `False`, and
+    edges are inserted without checking that their vertices exist. Futures
+    for created vertices and edges therefore resolve to `None`. Likewise,
+    batched properties are stored even if their vertex or edge does not
+    exist, where `Client.set_properties` would do nothing; they then show
+    up once that vertex or edge is created.
+    """
+
+    def __init__(self, client, max_items=1000, max_delay=0.01):
+        """
+        Creates a batcher writing through `client`, and starts its flusher
+        thread.
+        """
+        if max_items < 1:
+            raise ValueError("max_items must be at least 1")
+        if max_delay < 0:
+            raise ValueError("max_delay cannot be negative")
+
+        self.client = client
+        self.max_items = max_items
+        self.max_delay = max_delay
+        self._queue = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="indradb-write-batcher", daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _submit(self, entry):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("write batcher is closed")
+            self._queue.put(entry)
+        return entry[1]
+
+    def _add_item(self, **kwargs):
+        return self._submit((proto.BulkInsertItem(**kwargs), Future()))
+
+    def create_vertex(self, vertex):
+        """Queues a vertex to be created."""
+        return self._add_item(vertex=vertex.to_message())
+
+    def create_edge(self, edge):
+        """Queues an edge to be created."""
+        return self._add_item(edge=edge.to_message())
+
+    def set_properties(self, query, name, value):
+        """
+        Queues properties to be set. Properties on a `SpecificVertexQuery` or
+        `SpecificEdgeQuery` are batched; any other query is sent as its own
+        `SetProperties` call, in order with the batched writes.
+
+        Batched properties are written without checking that their vertices
+        or edges exist, so setting a property on a missing vertex or edge
+        leaves it waiting for that vertex or edge to be created, rather
+        than being ignored. Check that they exist first (e.g. with
+        `Client.vertices_exist`) if that matters.
+        """
+        codec = self.client.codec
+        if type(query) is SpecificVertexQuery:
+            items = [
+                proto.BulkInsertItem(vertex_property=_vertex_property_item(id, name, value, codec))
+                for id in query._ids
+            ]
+        elif type(query) is SpecificEdgeQuery:
+            items = [
+                proto.BulkInsertItem(edge_property=_edge_property_item(edge, name, value, codec))
+                for edge in query._edges
+            ]
+        else:
+            return self._submit((lambda: self.client.set_properties(query, name, value), Future()))
+
+        return self._submit((items, Future()))
+
+    def flush(self):
+        """Blocks until every write made so far has been sent."""
+        self._submit((None, Future())).result()
+
+    def close(self):
+        """Sends any pending writes and stops the flusher thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            entry = self._queue.get()
+            if entry is _STOP:
+                return
+
+            items = []
+            futures = []
+            deadline = time.monotonic() + self.max_delay
+            while True:
+                payload, future = entry
+                if isinstance(payload, proto.BulkInsertItem):
+                    items.append(payload)
+                    futures.append(future)
+                elif isinstance(payload, list):
+                    items.extend(payload)
+                    futures.append(future)
+                else:
+                    # flush markers and unbatchable calls end the batch
+                    self._send(items, futures)
+                    items, futures = [], []
+                    self._call(payload, future)
+
+                if len(items) >= self.max_items:
+                    break
+                try:
+                    entry = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    self._send(items, futures)
+                    return
+
+            self._send(items, futures)
+
+    def _send(self, items, futures):
+        try:
+            if items:
+                with self.client._writing():
+                    self.client.stub.BulkInsert(iter(items))
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+        else:
+            for future in futures:
+                future.set_result(None)
+
+    def _call(self, fn, future):
+        if fn is None:
+            future.set_result(None)
+            return
+        try:
+            future.set_result(fn())
+        except Exception as e:
+            future.set_exception(e)
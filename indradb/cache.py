@@ -0,0 +1,147 @@
+"""
+Client-side caching and coalescing of query results.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+class ResultCache:
+    """
+    An LRU cache of `Get` results, keyed on the serialized query.
+
+    Entries are the raw response messages, so a hit is decoded just like a
+    response from the server. The cache is bounded by `max_entries` and,
+    optionally, by `max_bytes` (the total serialized size of the cached
+    responses); the least recently used entries are evicted first. If `ttl`
+    is set, entries expire that many seconds after being stored.
+
+    A client invalidates its whole cache whenever it writes anything, so
+    entries can only be stale with respect to writes made by other clients.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=None, ttl=None, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._generation = 0
+
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def generation(self):
+        """Changes every time the cache is invalidated."""
+        return self._generation
+
+    def get(self, key):
+        """Returns the cached response chunks for `key`, or `None`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is not None and entry[0] <= self._clock():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key, chunks, generation=None):
+        """
+        Stores the response chunks for `key`. If `generation` is given and the
+        cache has been invalidated since, the result may be stale and is not
+        stored.
+        """
+        size = sum(chunk.ByteSize() for chunk in chunks)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            expires = self._clock() + self.ttl if self.ttl is not None else None
+            self._entries[key] = (expires, size, chunks)
+            self.bytes += size
+
+            while len(self._entries) > self.max_entries or \
+                    (self.max_bytes is not None and self.bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self):
+        """Drops every entry."""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+            self._generation += 1
+            self.invalidations += 1
+
+    def stats(self):
+        """Returns the cache's size and hit/miss/eviction counters."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.bytes -= size
+
+class _SingleFlight:
+    """
+    Shares one in-flight call between concurrent callers with the same key:
+    the first caller runs it, and the others wait for its result (or error).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+        if not leader:
+            return call.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+
+    def forget(self):
+        """Makes later callers start new calls rather than join current ones."""
+        with self._lock:
+            self._calls.clear()
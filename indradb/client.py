@@ -1,27 +1,256 @@
+import time
 import uuid
-import json
+import queue
 import itertools
+import threading
+import contextlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 
 import grpc
+import grpc.aio
 import indradb.indradb_pb2_grpc as indradb_grpc
 
-from .models import Vertex, Edge, VertexProperty, EdgeProperty, VertexProperties, EdgeProperties
+from . import columnar
+from .codec import default_codec
+from .prepared import PreparedQuery
+from .cache import _SingleFlight
+from .models import Vertex, Edge, VertexProperty, EdgeProperty, VertexProperties, EdgeProperties, \
+    VertexView, EdgeView, VertexPropertiesView, EdgePropertiesView, _BaseQuery, _split_query
 from indradb import proto
 
+ROUND_ROBIN = "round_robin"
+LEAST_OUTSTANDING = "least_outstanding"
+
 class Client:
     """Represents a connection to IndraDB"""
 
-    def __init__(self, host="localhost:27615"):
+    def __init__(self, host="localhost:27615", channels=1, balancing=ROUND_ROBIN, codec=None,
+                 cache=None, coalesce=False, max_workers=16, max_query_ids=10000, max_parts_in_flight=8):
         """
         Creates a new client.
 
         `host` is a string that specifies the server location, in the format
-        `hostname:port`.
+        `hostname:port`. `channels` is the number of channels (and therefore
+        HTTP/2 connections) to open to the server; requests are spread across
+        them according to `balancing`, which is either `"round_robin"` or
+        `"least_outstanding"` (pick the channel with the fewest in-flight
+        requests). `codec` is the `indradb.codec` JSON codec used for
+        property values, and defaults to `JsonCodec`. If
+        `cache` is a `ResultCache`, query results are served from it when
+        possible, and it is invalidated whenever this client writes. If
+        `coalesce` is set, concurrent identical queries share a single `Get`
+        call, whose response is buffered and handed to every caller.
+        `max_workers` bounds the threads used to read the `Get` streams of
+        `get_future` and `get_many`. Queries on more than `max_query_ids`
+        specific vertices or edges are split into several concurrent
+        requests, to stay below gRPC's message size limit; set it to `None`
+        to always send queries whole. Up to `max_parts_in_flight` of those
+        requests are read at once.
         """
 
         self.host = host
-        channel = grpc.insecure_channel(host)
-        self.stub = indradb_grpc.IndraDBStub(channel)
+        self.codec = codec or default_codec()
+        self.cache = cache
+        self.max_workers = max_workers
+        self.max_query_ids = max_query_ids
+        self.max_parts_in_flight = max_parts_in_flight
+        self._flights = _SingleFlight() if coalesce else None
+        self._pool = _ChannelPool(host, channels, balancing)
+        self._executor = None
+        self._part_executor = None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def stub(self):
+        """The stub to use for the next request, picked from the pool."""
+        return self._pool.next_stub()
+
+    def close(self):
+        """Closes all of the client's channels."""
+        if self._executor is not None:
+            self._executor.shutdown()
+        if self._part_executor is not None:
+            self._part_executor.shutdown()
+        self._pool.close()
+
+    @property
+    def executor(self):
+        """The thread pool that reads `Get` streams for `get_future`."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    @property
+    def part_executor(self):
+        """
+        The thread pool that reads the parts of split queries. It is kept
+        apart from `executor`, which may itself be running the split
+        queries, and would then deadlock waiting on their parts.
+        """
+        with self._executor_lock:
+            if self._part_executor is None:
+                self._part_executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            return self._part_executor
+
+    def _chain(self, call, transform, write=False):
+        """
+        Converts a gRPC call future into a `concurrent.futures.Future` of the
+        transformed response.
+        """
+        future = Future()
+        future.set_running_or_notify_cancel()
+
+        def done(call):
+            try:
+                if write:
+                    with self._writing():
+                        res = call.result()
+                else:
+                    res = call.result()
+                future.set_result(transform(res))
+            except Exception as e:
+                future.set_exception(e)
+
+        call.add_done_callback(done)
+        return future
+
+    def _chain_writes(self, calls):
+        """
+        Combines the gRPC call futures of a split write into a
+        `concurrent.futures.Future` that resolves to `None` once all of them
+        are done, or fails with the first error.
+        """
+        future = Future()
+        future.set_running_or_notify_cancel()
+        lock = threading.Lock()
+        remaining = [len(calls)]
+        errors = []
+
+        def done(call):
+            try:
+                with self._writing():
+                    call.result()
+            except Exception as e:
+                errors.append(e)
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            if errors:
+                future.set_exception(errors[0])
+            else:
+                future.set_result(None)
+
+        for call in calls:
+            call.add_done_callback(done)
+        return future
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @contextlib.contextmanager
+    def _writing(self):
+        """
+        Invalidates the result cache once a write is done (or failed), and
+        keeps later reads from joining calls that may predate the write.
+        """
+        try:
+            yield
+        finally:
+            if self.cache is not None:
+                self.cache.invalidate()
+            if self._flights is not None:
+                self._flights.forget()
+
+    def _get_chunks(self, req, timeout=None):
+        """
+        Yields the raw response chunks of a `Get` request, which fails if it
+        takes longer than `timeout` seconds.
+        """
+        if self.cache is None and self._flights is None:
+            call = self.stub.Get(req, timeout=timeout)
+            try:
+                yield from call
+            finally:
+                # stops the server streaming if the caller stopped early
+                call.cancel()
+            return
+
+        if self.cache is not None:
+            chunks = self.cache.get(req)
+            if chunks is not None:
+                yield from chunks
+                return
+            generation = self.cache.generation
+
+        if self._flights is not None:
+            chunks = self._flights.do(req, lambda: list(self.stub.Get(req, timeout=timeout)))
+            yield from chunks
+        else:
+            chunks = []
+            call = self.stub.Get(req, timeout=timeout)
+            try:
+                for res_chunk in call:
+                    chunks.append(res_chunk)
+                    yield res_chunk
+            finally:
+                call.cancel()
+
+        if self.cache is not None:
+            self.cache.put(req, chunks, generation)
+
+    def _split(self, query):
+        """Splits a query on too many specific IDs into smaller ones."""
+        if self.max_query_ids is None or not isinstance(query, _BaseQuery):
+            return [query]
+        return _split_query(query, self.max_query_ids)
+
+    def _query_chunks(self, query, timeout=None):
+        """
+        Yields the raw response chunks of a query. The parts of a split query
+        are read concurrently, one output at a time: once every part has
+        returned its chunk for an output, they are merged and yielded, so the
+        result is the same as if the query had been sent whole. Stopping
+        early cancels the parts' calls.
+        """
+        parts = self._split(query)
+        if len(parts) == 1:
+            yield from self._get_chunks(query.to_bytes(self.codec), timeout)
+            return
+
+        streams = [self._get_chunks(part.to_bytes(self.codec), timeout) for part in parts]
+        try:
+            while True:
+                res_chunks = [res_chunk for res_chunk in self._next_chunks(streams) if res_chunk is not None]
+                if not res_chunks:
+                    return
+                yield _merge_chunks(res_chunks)
+        finally:
+            for stream in streams:
+                stream.close()
+
+    def _next_chunks(self, streams):
+        """
+        Reads the next chunk of each stream (or `None` if it has ended) on
+        the `part_executor`, `max_parts_in_flight` streams at a time.
+        """
+        if self.max_parts_in_flight < 1:
+            raise ValueError("max_parts_in_flight must be at least 1")
+
+        res_chunks = []
+        for i in range(0, len(streams), self.max_parts_in_flight):
+            futures = [self.part_executor.submit(next, stream, None)
+                       for stream in streams[i:i + self.max_parts_in_flight]]
+            # wait for every read, so no stream is still being read when
+            # the streams are closed
+            wait(futures)
+            res_chunks.extend(future.result() for future in futures)
+        return res_chunks
 
     def ping(self):
         req = proto.google_dot_protobuf_dot_empty__pb2.Empty()
@@ -38,7 +267,8 @@ class Client:
         `vertex` specifies the `Vertex` to create.
         """
         req = vertex.to_message()
-        res = self.stub.CreateVertex(req)
+        with self._writing():
+            res = self.stub.CreateVertex(req)
         return res.created
 
     def create_vertex_from_type(self, t):
@@ -48,46 +278,213 @@ class Client:
         `t` specifies the new vertex's type.
         """
         req = proto.Identifier(value=t)
-        res = self.stub.CreateVertexFromType(req)
+        with self._writing():
+            res = self.stub.CreateVertexFromType(req)
         return uuid.UUID(bytes=res.value)
 
     def create_edge(self, edge):
         """Creates a new edge."""
         req = edge.to_message()
-        res = self.stub.CreateEdge(req)
+        with self._writing():
+            res = self.stub.CreateEdge(req)
         return res.created
 
-    def get(self, query):
-        """Gets values specified by a query."""
-        req = query.to_message()
-        res = self.stub.Get(req)
-        for res_chunk in res:
-            variant = res_chunk.WhichOneof("value")
-            if variant == "count":
-                yield res_chunk.count
-            elif variant == "vertices":
-                yield [Vertex.from_message(item) for item in res_chunk.vertices.vertices]
-            elif variant == "edges":
-                yield [Edge.from_message(item) for item in res_chunk.edges.edges]
-            elif variant == "vertex_properties":
-                yield [VertexProperties.from_message(item) for item in res_chunk.vertex_properties.vertex_properties]
-            elif variant == "edge_properties":
-                yield [EdgeProperties.from_message(item) for item in res_chunk.edge_properties.edge_properties]
+    def create_vertex_future(self, vertex):
+        """Like `create_vertex`, but returns a future instead of blocking."""
+        call = self.stub.CreateVertex.future(vertex.to_message())
+        return self._chain(call, lambda res: res.created, write=True)
+
+    def create_vertex_from_type_future(self, t):
+        """Like `create_vertex_from_type`, but returns a future instead of blocking."""
+        call = self.stub.CreateVertexFromType.future(proto.Identifier(value=t))
+        return self._chain(call, lambda res: uuid.UUID(bytes=res.value), write=True)
+
+    def create_edge_future(self, edge):
+        """Like `create_edge`, but returns a future instead of blocking."""
+        call = self.stub.CreateEdge.future(edge.to_message())
+        return self._chain(call, lambda res: res.created, write=True)
+
+    def get(self, query, lazy=False, timeout=None):
+        """
+        Gets values specified by a query.
+
+        If `lazy` is set, vertices, edges and properties are returned as views
+        (`VertexView`, `EdgeView`, ...) that only decode their fields when
+        accessed, which is cheaper when results are just counted or filtered.
+        If the call takes longer than `timeout` seconds, it fails with a
+        `grpc.RpcError` whose code is `DEADLINE_EXCEEDED`.
+        """
+        for res_chunk in self._query_chunks(query, timeout):
+            yield _decode_chunk(res_chunk, lazy, self.codec)
+
+    def stream(self, query, lazy=False):
+        """
+        Gets values specified by a query as a flat `ResultStream` of
+        vertices, edges, properties or counts, rather than one list per
+        chunk. Closing the stream cancels the call.
+        """
+        return ResultStream(self._query_chunks(query), lazy, self.codec)
+
+    def get_future(self, query, lazy=False):
+        """
+        Like `get`, but reads the whole response on the client's `executor`,
+        returning a future of the list of chunks.
+        """
+        return self.executor.submit(lambda: list(self.get(query, lazy)))
+
+    def get_many(self, queries, max_in_flight=8, lazy=False, timeout=None):
+        """
+        Runs many queries concurrently, yielding the list of chunks of each
+        query in order. At most `max_in_flight` queries (and no more than the
+        client's `max_workers`) are running at once. `timeout` bounds the
+        time, in seconds, that all of the queries together may take (see
+        `get`).
+        """
+        if timeout is None:
+            return self._map_in_flight(lambda query: list(self.get(query, lazy)), queries, max_in_flight)
+
+        deadline = time.monotonic() + timeout
+
+        def get(query):
+            return list(self.get(query, lazy, max(deadline - time.monotonic(), 0)))
+
+        return self._map_in_flight(get, queries, max_in_flight)
+
+    def _map_in_flight(self, fn, items, max_in_flight, executor=None):
+        """
+        Calls `fn` on each item on `executor` (by default, the client's
+        `executor`), yielding the results in order, with at most
+        `max_in_flight` calls running at once.
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        if executor is None:
+            executor = self.executor
+
+        pending = deque()
+        try:
+            for item in items:
+                if len(pending) >= max_in_flight:
+                    yield pending.popleft().result()
+                pending.append(executor.submit(fn, item))
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def vertices_exist(self, ids, batch_size=10000, max_in_flight=8):
+        """
+        Checks which of the given vertices exist, returning a NumPy boolean
+        mask aligned with `ids`, which are UUIDs or a UUID column (see
+        `indradb.columnar`). IDs are checked `batch_size` at a time, with
+        up to `max_in_flight` batches running at once.
+        """
+        import numpy as np
+
+        ids = columnar.uuid_array(ids)
+
+        def check(batch):
+            req = columnar.specific_vertex_query(batch)
+            found = b"".join(
+                vertex.id.value
+                for res_chunk in self._get_chunks(req)
+                for vertex in res_chunk.vertices.vertices
+            )
+            return np.isin(_uuid_keys(batch), _uuid_keys(found))
+
+        batches = (ids[i:i + batch_size] for i in range(0, len(ids), batch_size))
+        return np.concatenate([np.zeros(0, dtype=bool)] + list(self._map_in_flight(check, batches, max_in_flight)))
+
+    def edges_exist(self, edges, batch_size=5000, max_in_flight=8):
+        """
+        Checks which of the given edges exist, returning a NumPy boolean
+        mask aligned with `edges`, which are `Edge`s or
+        `(outbound_id, t, inbound_id)` tuples. Edges are checked
+        `batch_size` at a time, with up to `max_in_flight` batches running
+        at once.
+        """
+        import numpy as np
+
+        keys = [
+            (e[0].bytes, e[1], e[2].bytes) if isinstance(e, tuple) else (e.outbound_id.bytes, e.t, e.inbound_id.bytes)
+            for e in edges
+        ]
+
+        def check(batch):
+            req = proto.Query(specific_edge=proto.SpecificEdgeQuery(edges=[
+                proto.Edge(
+                    outbound_id=proto.Uuid(value=outbound_id),
+                    t=proto.Identifier(value=t),
+                    inbound_id=proto.Uuid(value=inbound_id),
+                )
+                for (outbound_id, t, inbound_id) in batch
+            ])).SerializeToString()
+            found = {
+                (edge.outbound_id.value, edge.t.value, edge.inbound_id.value)
+                for res_chunk in self._get_chunks(req)
+                for edge in res_chunk.edges.edges
+            }
+            return np.fromiter((key in found for key in batch), dtype=bool, count=len(batch))
+
+        batches = (keys[i:i + batch_size] for i in range(0, len(keys), batch_size))
+        return np.concatenate([np.zeros(0, dtype=bool)] + list(self._map_in_flight(check, batches, max_in_flight)))
+
+    def prepare(self, query):
+        """
+        Compiles a query containing `Param` placeholders into a
+        `PreparedQuery`, whose `bind` method quickly produces a query that can
+        be passed to `get`, `delete`, etc.
+        """
+        return PreparedQuery(query, self.codec)
+
+    def get_columns(self, query, format=columnar.NUMPY):
+        """
+        Gets values specified by a query, decoding each chunk into columns
+        rather than model objects.
+
+        `format` is either `"numpy"` (each chunk is a dict of NumPy arrays) or
+        `"arrow"` (each chunk is a pyarrow `RecordBatch`). See
+        `indradb.columnar` for the column layout.
+        """
+        for res_chunk in self._query_chunks(query):
+            yield columnar.decode_chunk(res_chunk, format)
 
     def delete(self, query):
         """Deletes values specified by a query."""
-        req = query.to_message()
-        self.stub.Delete(req)
+        with self._writing():
+            for part in self._split(query):
+                self.stub.Delete(part.to_bytes(self.codec))
+
+    def delete_future(self, query):
+        """Like `delete`, but returns a future instead of blocking."""
+        calls = [self.stub.Delete.future(part.to_bytes(self.codec)) for part in self._split(query)]
+        return self._chain_writes(calls)
 
     def set_properties(self, query, name, value):
         """Sets properties."""
-        req = proto.SetPropertiesRequest(
-            q=query.to_message(),
-            name=proto.Identifier(value=name),
-            value=proto.Json(value=json.dumps(value)),
-        )
+        value = proto.Json(value=self.codec.dumps(value))
+        with self._writing():
+            for part in self._split(query):
+                req = proto.SetPropertiesRequest(
+                    q=part.to_message(self.codec),
+                    name=proto.Identifier(value=name),
+                    value=value,
+                )
+                self.stub.SetProperties(req)
 
-        self.stub.SetProperties(req)
+    def set_properties_future(self, query, name, value):
+        """Like `set_properties`, but returns a future instead of blocking."""
+        value = proto.Json(value=self.codec.dumps(value))
+        calls = [
+            self.stub.SetProperties.future(proto.SetPropertiesRequest(
+                q=part.to_message(self.codec),
+                name=proto.Identifier(value=name),
+                value=value,
+            ))
+            for part in self._split(query)
+        ]
+        return self._chain_writes(calls)
 
     def index_property(self, name):
         req = proto.IndexPropertyRequest(name=proto.Identifier(value=name))
@@ -95,18 +492,360 @@ class Client:
 
     def execute_plugin(self, name, arg):
         req = proto.ExecutePluginRequest(
+            name=name,
+            arg=proto.Json(value=self.codec.dumps(arg)),
+        )
+        # plugins may write, so treat them as writes
+        with self._writing():
+            res = self.stub.ExecutePlugin(req)
+        return self.codec.loads(res.value.value)
+
+class AsyncClient:
+    """
+    Represents an asyncio connection to IndraDB.
+
+    This mirrors `Client`, but is built on `grpc.aio`, so every method is a
+    coroutine (and `get` is an async generator) that can be awaited from an
+    event loop without blocking a thread per in-flight request.
+    """
+
+    def __init__(self, host="localhost:27615", codec=None):
+        """
+        Creates a new asyncio client. This should be called from within a
+        running event loop.
+
+        `host` is a string that specifies the server location, in the format
+        `hostname:port`. `codec` is the JSON codec used for property values.
+        """
+
+        self.host = host
+        self.codec = codec or default_codec()
+        self.channel = grpc.aio.insecure_channel(host)
+        self.stub = _Stub(self.channel)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        """Closes the underlying channel."""
+        await self.channel.close()
+
+    async def ping(self):
+        req = proto.google_dot_protobuf_dot_empty__pb2.Empty()
+        await self.stub.Ping(req)
+
+    async def sync(self):
+        req = proto.google_dot_protobuf_dot_empty__pb2.Empty()
+        await self.stub.Sync(req)
+
+    async def create_vertex(self, vertex):
+        """
+        Creates a new vertex.
+
+        `vertex` specifies the `Vertex` to create.
+        """
+        req = vertex.to_message()
+        res = await self.stub.CreateVertex(req)
+        return res.created
+
+    async def create_vertex_from_type(self, t):
+        """
+        Creates a new vertex from a type.
+
+        `t` specifies the new vertex's type.
+        """
+        req = proto.Identifier(value=t)
+        res = await self.stub.CreateVertexFromType(req)
+        return uuid.UUID(bytes=res.value)
+
+    async def create_edge(self, edge):
+        """Creates a new edge."""
+        req = edge.to_message()
+        res = await self.stub.CreateEdge(req)
+        return res.created
+
+    async def get(self, query, lazy=False):
+        """
+        Gets values specified by a query. This is an async generator that
+        yields one decoded chunk at a time, as they arrive from the server.
+        See `Client.get` for `lazy`.
+        """
+        req = query.to_bytes(self.codec)
+        call = self.stub.Get(req)
+        try:
+            async for res_chunk in call:
+                yield _decode_chunk(res_chunk, lazy, self.codec)
+        finally:
+            call.cancel()
+
+    async def delete(self, query):
+        """Deletes values specified by a query."""
+        req = query.to_bytes(self.codec)
+        await self.stub.Delete(req)
+
+    async def set_properties(self, query, name, value):
+        """Sets properties."""
+        req = proto.SetPropertiesRequest(
+            q=query.to_message(self.codec),
             name=proto.Identifier(value=name),
-            arg=proto.Json(value=json.dumps(arg)),
+            value=proto.Json(value=self.codec.dumps(value)),
         )
-        res = self.stub.IndexProperty(req)
-        return json.loads(res.value.value)
 
-class BulkInserter:
+        await self.stub.SetProperties(req)
+
+    async def index_property(self, name):
+        req = proto.IndexPropertyRequest(name=proto.Identifier(value=name))
+        return await self.stub.IndexProperty(req)
+
+    async def execute_plugin(self, name, arg):
+        req = proto.ExecutePluginRequest(
+            name=name,
+            arg=proto.Json(value=self.codec.dumps(arg)),
+        )
+        res = await self.stub.ExecutePlugin(req)
+        return self.codec.loads(res.value.value)
+
+def _serialize_query(query):
+    """Serializes a `Query` message, passing already encoded queries through."""
+    return query if isinstance(query, bytes) else query.SerializeToString()
+
+class _Stub(indradb_grpc.IndraDBStub):
+    """
+    An `IndraDBStub` whose `Get` and `Delete` also accept queries that have
+    already been serialized, e.g. by `to_bytes`.
+    """
+
+    def __init__(self, channel):
+        super().__init__(channel)
+        self.Get = channel.unary_stream(
+            "/indradb.IndraDB/Get",
+            request_serializer=_serialize_query,
+            response_deserializer=proto.QueryOutputValue.FromString,
+        )
+        self.Delete = channel.unary_unary(
+            "/indradb.IndraDB/Delete",
+            request_serializer=_serialize_query,
+            response_deserializer=proto.google_dot_protobuf_dot_empty__pb2.Empty.FromString,
+        )
+
+class _InFlightCounter(grpc.UnaryUnaryClientInterceptor,
+                       grpc.UnaryStreamClientInterceptor,
+                       grpc.StreamUnaryClientInterceptor):
+    """
+    Interceptor that tracks the number of unfinished calls on a channel.
+
+    A call is counted from the moment its channel is picked (see `acquire`)
+    until it finishes. Blocking calls only reach the interceptor once they
+    are done, so counting the calls it sees would miss them.
+    """
+
     def __init__(self):
-        self._reqs = []
+        self._lock = threading.Lock()
+        self.in_flight = 0
+
+    def acquire(self):
+        """Counts a call that is about to be made on the channel."""
+        with self._lock:
+            self.in_flight += 1
+
+    def _track(self, continuation, *args):
+        try:
+            call = continuation(*args)
+        except Exception:
+            self._done(None)
+            raise
+        # runs right away if the call is already done
+        call.add_done_callback(self._done)
+        return call
+
+    def _done(self, call):
+        with self._lock:
+            self.in_flight -= 1
+
+    def intercept_unary_unary(self, continuation, client_call_details, request):
+        return self._track(continuation, client_call_details, request)
+
+    def intercept_unary_stream(self, continuation, client_call_details, request):
+        return self._track(continuation, client_call_details, request)
+
+    def intercept_stream_unary(self, continuation, client_call_details, request_iterator):
+        return self._track(continuation, client_call_details, request_iterator)
+
+class _ChannelPool:
+    """A fixed set of channels to the same host, with a stub for each."""
+
+    def __init__(self, host, size, balancing):
+        if size < 1:
+            raise ValueError("channel pool size must be at least 1")
+        if balancing not in (ROUND_ROBIN, LEAST_OUTSTANDING):
+            raise ValueError("unknown balancing strategy: {}".format(balancing))
+
+        # Without a local subchannel pool, grpc would share a single
+        # connection between all channels to the same target.
+        options = [("grpc.use_local_subchannel_pool", 1)] if size > 1 else None
+        self._channels = [grpc.insecure_channel(host, options=options) for _ in range(size)]
+        self._counters = None
+
+        if balancing == LEAST_OUTSTANDING and size > 1:
+            self._counters = [_InFlightCounter() for _ in range(size)]
+            channels = [grpc.intercept_channel(c, i) for c, i in zip(self._channels, self._counters)]
+        else:
+            channels = self._channels
+
+        self._stubs = [_Stub(c) for c in channels]
+        self._next = itertools.cycle(range(size))
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._stubs)
+
+    def next_stub(self):
+        """
+        Returns the stub for the next call. With `least_outstanding`
+        balancing, the call is counted against its channel from here on, so
+        exactly one call must be made on the stub.
+        """
+        if len(self._stubs) == 1:
+            return self._stubs[0]
+        if self._counters is not None:
+            with self._lock:
+                i = min(range(len(self._counters)), key=lambda i: self._counters[i].in_flight)
+                self._counters[i].acquire()
+            return self._stubs[i]
+        return self._stubs[next(self._next)]
+
+    def close(self):
+        for channel in self._channels:
+            channel.close()
+
+def _uuid_keys(ids):
+    """Views UUID bytes as a 1-d NumPy array with one 16-byte value per UUID."""
+    import numpy as np
+    return np.frombuffer(ids, dtype="V{}".format(columnar.UUID_WIDTH))
+
+def _decode_chunk(res_chunk, lazy=False, codec=None):
+    """
+    Converts a `QueryOutputValue` message into python values, or into views
+    over the message if `lazy` is set. Property values are decoded with
+    `codec`.
+    """
+    variant = res_chunk.WhichOneof("value")
+    if variant == "count":
+        return res_chunk.count
+    elif variant == "vertices":
+        cls = VertexView if lazy else Vertex
+        return [cls.from_message(item) for item in res_chunk.vertices.vertices]
+    elif variant == "edges":
+        cls = EdgeView if lazy else Edge
+        return [cls.from_message(item) for item in res_chunk.edges.edges]
+    elif variant == "vertex_properties":
+        cls = VertexPropertiesView if lazy else VertexProperties
+        return [cls.from_message(item, codec) for item in res_chunk.vertex_properties.vertex_properties]
+    elif variant == "edge_properties":
+        cls = EdgePropertiesView if lazy else EdgeProperties
+        return [cls.from_message(item, codec) for item in res_chunk.edge_properties.edge_properties]
+
+def _merge_chunks(res_chunks):
+    """
+    Merges the `QueryOutputValue` messages that the parts of a split query
+    returned for the same output, concatenating their items or summing
+    their counts.
+    """
+    variants = {res_chunk.WhichOneof("value") for res_chunk in res_chunks} - {None}
+    if not variants:
+        return proto.QueryOutputValue()
+    if len(variants) > 1:
+        raise ValueError("parts of a split query returned different kinds of output")
+
+    variant = variants.pop()
+    if variant == "count":
+        return proto.QueryOutputValue(count=sum(res_chunk.count for res_chunk in res_chunks))
+    merged = proto.QueryOutputValue()
+    getattr(merged, variant).SetInParent()
+    items = getattr(getattr(merged, variant), variant)
+    for res_chunk in res_chunks:
+        items.extend(getattr(getattr(res_chunk, variant), variant))
+    return merged
+
+class ResultStream:
+    """
+    A flat iterator over the results of a query: each item is a `Vertex`,
+    `Edge`, `VertexProperties`, `EdgeProperties` (or their views), or a
+    count. Closing the stream, directly or by leaving a `with` block, cancels
+    the underlying call, so the server stops sending results that will not
+    be read.
+    """
+
+    def __init__(self, chunks, lazy=False, codec=None):
+        self._chunks = chunks
+        self._lazy = lazy
+        self._codec = codec
+        self._items = iter(())
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while True:
+            for item in self._items:
+                return item
+            # raises `StopIteration` once the call is done
+            value = _decode_chunk(next(self._chunks), self._lazy, self._codec)
+            self._items = iter(value if isinstance(value, list) else [value])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def take(self, n):
+        """Returns a list of the next `n` results at most, then closes the stream."""
+        try:
+            return list(itertools.islice(self, n))
+        finally:
+            self.close()
+
+    def close(self):
+        """Cancels the call, if it is still running."""
+        self._chunks.close()
+        self._items = iter(())
+
+class BulkInserter:
+    """
+    Inserts many vertices, edges and properties in `BulkInsert` streams.
+
+    Items can be added one at a time (`vertex`, `edge`, ...), or as
+    iterables (`vertices`, `edges`, ...). Iterables are not read until
+    `execute` is called, and are encoded lazily as the stream is consumed, so
+    generators can be used to load more data than fits in memory. Items are
+    sent in the order they were added.
+    """
+
+    def __init__(self, max_items=None, max_bytes=None, codec=None):
+        """
+        Creates a new bulk inserter.
+
+        By default everything is sent in a single `BulkInsert` call. If
+        `max_items` or `max_bytes` are set, the load is instead split into
+        consecutive calls, each holding at most that many items or serialized
+        bytes. `codec` is the JSON codec used for property values.
+        """
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.codec = codec or default_codec()
+        self._sources = []
 
     def _add_req(self, **kwargs):
-        self._reqs.append(proto.BulkInsertItem(**kwargs))
+        if not self._sources or not isinstance(self._sources[-1], list):
+            self._sources.append([])
+        self._sources[-1].append(proto.BulkInsertItem(**kwargs))
+
+    def _add_source(self, reqs):
+        self._sources.append(reqs)
 
     def vertex(self, vertex):
         self._add_req(vertex=vertex.to_message())
@@ -117,20 +856,308 @@ class BulkInserter:
         return self
 
     def vertex_property(self, id, name, value):
-        self._add_req(vertex_property=proto.VertexPropertyBulkInsertItem(
-            id=proto.Uuid(value=id.bytes),
-            name=proto.Identifier(value=name),
-            value=proto.Json(value=json.dumps(value)),
-        ))
+        self._add_req(vertex_property=_vertex_property_item(id, name, value, self.codec))
         return self
 
     def edge_property(self, edge, name, value):
-        self._add_req(edge_property=proto.EdgePropertyBulkInsertItem(
-            edge=edge.to_message(),
-            name=proto.Identifier(value=name),
-            value=proto.Json(value=json.dumps(value)),
-        ))
+        self._add_req(edge_property=_edge_property_item(edge, name, value, self.codec))
+        return self
+
+    def vertices(self, vertices):
+        """Lazily inserts each `Vertex` from an iterable."""
+        self._add_source(proto.BulkInsertItem(vertex=v.to_message()) for v in vertices)
+        return self
+
+    def edges(self, edges):
+        """Lazily inserts each `Edge` from an iterable."""
+        self._add_source(proto.BulkInsertItem(edge=e.to_message()) for e in edges)
+        return self
+
+    def vertex_properties(self, props):
+        """Lazily inserts vertex properties from an iterable of `(id, name, value)` tuples."""
+        self._add_source(
+            proto.BulkInsertItem(vertex_property=_vertex_property_item(id, name, value, self.codec))
+            for (id, name, value) in props
+        )
+        return self
+
+    def edge_properties(self, props):
+        """Lazily inserts edge properties from an iterable of `(edge, name, value)` tuples."""
+        self._add_source(
+            proto.BulkInsertItem(edge_property=_edge_property_item(edge, name, value, self.codec))
+            for (edge, name, value) in props
+        )
+        return self
+
+    def vertex_arrays(self, ids, types):
+        """
+        Lazily inserts vertices from columns, without building a `Vertex` for
+        each row.
+
+        `ids` is a UUID column (e.g. an `N x 16` `uint8` NumPy array) and
+        `types` is either a column of type strings or a single type for every
+        vertex. See `indradb.columnar` for the accepted column formats.
+        """
+        self._add_source(columnar.vertex_items(ids, types))
         return self
 
+    def edge_arrays(self, outbound_ids, types, inbound_ids):
+        """
+        Lazily inserts edges from columns, without building an `Edge` for
+        each row.
+
+        `outbound_ids` and `inbound_ids` are UUID columns, and `types` is
+        either a column of type strings or a single type for every edge.
+        """
+        self._add_source(columnar.edge_items(outbound_ids, types, inbound_ids))
+        return self
+
+    def vertex_table(self, table, id="id", t="t"):
+        """
+        Lazily inserts vertices from a pyarrow `Table` or `RecordBatch`, with
+        a `fixed_size_binary(16)` column named `id` and a string column named
+        `t`.
+        """
+        return self.vertex_arrays(table.column(id), table.column(t))
+
+    def edge_table(self, table, outbound_id="outbound_id", t="t", inbound_id="inbound_id"):
+        """
+        Lazily inserts edges from a pyarrow `Table` or `RecordBatch`, with
+        `fixed_size_binary(16)` columns named `outbound_id` and `inbound_id`,
+        and a string column named `t`.
+        """
+        return self.edge_arrays(table.column(outbound_id), table.column(t), table.column(inbound_id))
+
+    def _chunks(self):
+        """
+        Yields one iterator of `BulkInsertItem`s per `BulkInsert` call. Each
+        chunk must be fully consumed before the next one is requested.
+        """
+        items = itertools.chain.from_iterable(self._sources)
+        if self.max_items is None and self.max_bytes is None:
+            yield items
+            return
+
+        head = [next(items, None)]
+
+        def chunk():
+            count = size = 0
+            while head[0] is not None:
+                item = head[0]
+                item_size = item.ByteSize() if self.max_bytes is not None else 0
+                if count > 0:
+                    if self.max_items is not None and count >= self.max_items:
+                        return
+                    if self.max_bytes is not None and size + item_size > self.max_bytes:
+                        return
+                yield item
+                count += 1
+                size += item_size
+                head[0] = next(items, None)
+
+        while head[0] is not None:
+            yield chunk()
+
     def execute(self, client):
-        client.stub.BulkInsert(iter(self._reqs))
+        with client._writing():
+            for chunk in self._chunks():
+                client.stub.BulkInsert(chunk)
+
+    async def execute_async(self, client):
+        """Executes the bulk insert through an `AsyncClient`."""
+        for chunk in self._chunks():
+            await client.stub.BulkInsert(chunk)
+
+    def execute_parallel(self, client, shards=4, batch_size=1000):
+        """
+        Executes the bulk insert over several concurrent `BulkInsert` streams.
+
+        Items are dealt out to `shards` streams in batches of `batch_size`.
+        Items with the same key (a vertex's ID, an edge, or a vertex or edge
+        and a property name) always go to the same stream, in the order they
+        were added, so repeated writes to the same key are applied in order.
+        Whenever an item could depend on an earlier one that may still be in
+        flight on another stream (e.g. an edge following its vertices), all
+        streams are flushed first, so vertices are always inserted before the
+        edges and properties that need them. `max_items` and `max_bytes` are
+        not applied.
+
+        Returns a `BulkInsertReport` with the throughput of each shard and of
+        the whole load.
+        """
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+
+        start = time.monotonic()
+        items = itertools.chain.from_iterable(self._sources)
+
+        with client._writing(), ThreadPoolExecutor(max_workers=shards) as executor:
+            workers = [_BulkInsertShard(client, executor) for _ in range(shards)]
+            try:
+                for batches in _stage_batches(items, batch_size, shards):
+                    for worker in workers:
+                        worker.start()
+                    for shard, batch in batches:
+                        workers[shard].put(batch)
+                    for worker in workers:
+                        worker.finish()
+            except BaseException:
+                for worker in workers:
+                    worker.abort()
+                raise
+
+        total = BulkInsertStats(sum(w.items for w in workers), time.monotonic() - start)
+        return BulkInsertReport([BulkInsertStats(w.items, w.seconds) for w in workers], total)
+
+# How early each kind of item must be inserted; an item can only depend on
+# items with a lower stage.
+_ITEM_STAGES = {
+    "vertex": 0,
+    "edge": 1,
+    "vertex_property": 1,
+    "edge_property": 2,
+}
+
+def _item_key(item):
+    """
+    Returns the key written by a bulk insert item, so that items writing the
+    same thing can be kept in order.
+    """
+    variant = item.WhichOneof("item")
+    if variant == "vertex":
+        return item.vertex.id.value
+    elif variant == "edge":
+        return _edge_key(item.edge)
+    elif variant == "vertex_property":
+        return (item.vertex_property.id.value, item.vertex_property.name.value)
+    else:
+        return (_edge_key(item.edge_property.edge), item.edge_property.name.value)
+
+def _edge_key(edge):
+    return (edge.outbound_id.value, edge.t.value, edge.inbound_id.value)
+
+def _stage_batches(items, batch_size, shards):
+    """
+    Splits bulk insert items into phases that are safe to insert concurrently,
+    yielding an iterator of `(shard, batch)` pairs for each phase. Items with
+    the same key go to the same shard. Each phase must be fully consumed
+    before the next one is requested.
+    """
+    head = [next(items, None)]
+
+    def phase():
+        min_stage = None
+        batches = [[] for _ in range(shards)]
+        while head[0] is not None:
+            stage = _ITEM_STAGES[head[0].WhichOneof("item")]
+            if min_stage is not None and stage > min_stage:
+                break
+            min_stage = stage if min_stage is None else min(min_stage, stage)
+            shard = hash(_item_key(head[0])) % shards
+            batches[shard].append(head[0])
+            head[0] = next(items, None)
+            if len(batches[shard]) >= batch_size:
+                yield shard, batches[shard]
+                batches[shard] = []
+        for shard, batch in enumerate(batches):
+            if batch:
+                yield shard, batch
+
+    while head[0] is not None:
+        yield phase()
+
+class _BulkInsertShard:
+    """One of the streams of a parallel bulk insert, fed through a queue."""
+
+    def __init__(self, client, executor):
+        self.items = 0
+        self.seconds = 0.0
+        self._client = client
+        self._executor = executor
+        self._queue = queue.Queue(maxsize=4)
+        self._future = None
+
+    def start(self):
+        self._future = self._executor.submit(self._run)
+
+    def _run(self):
+        start = time.monotonic()
+        try:
+            self._client.stub.BulkInsert(self._requests())
+        finally:
+            self.seconds += time.monotonic() - start
+
+    def _requests(self):
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                return
+            yield from batch
+            self.items += len(batch)
+
+    def put(self, batch):
+        while True:
+            try:
+                self._queue.put(batch, timeout=0.1)
+                return
+            except queue.Full:
+                if self._future.done():
+                    self._future.result()
+                    raise RuntimeError("bulk insert stream closed early")
+
+    def finish(self):
+        self.put(None)
+        self._future.result()
+
+    def abort(self):
+        if self._future is None or self._future.done():
+            return
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+        self._queue.put_nowait(None)
+
+class BulkInsertStats:
+    """Throughput of a bulk insert, or of one shard of it."""
+
+    __slots__ = ["items", "seconds"]
+
+    def __init__(self, items, seconds):
+        self.items = items
+        self.seconds = seconds
+
+    @property
+    def items_per_second(self):
+        return self.items / self.seconds if self.seconds > 0 else 0.0
+
+    def __repr__(self):
+        return "BulkInsertStats(items={}, seconds={:.3f}, items_per_second={:.0f})".format(
+            self.items, self.seconds, self.items_per_second)
+
+class BulkInsertReport:
+    """
+    Result of `BulkInserter.execute_parallel`. `shards` holds the
+    `BulkInsertStats` of each stream, and `total` those of the whole load.
+    """
+
+    __slots__ = ["shards", "total"]
+
+    def __init__(self, shards, total):
+        self.shards = shards
+        self.total = total
+
+def _vertex_property_item(id, name, value, codec):
+    return proto.VertexPropertyBulkInsertItem(
+        id=proto.Uuid(value=id.bytes),
+        name=proto.Identifier(value=name),
+        value=proto.Json(value=codec.dumps(value)),
+    )
+
+def _edge_property_item(edge, name, value, codec):
+    return proto.EdgePropertyBulkInsertItem(
+        edge=edge.to_message(),
+        name=proto.Identifier(value=name),
+        value=proto.Json(value=codec.dumps(value)),
+    )
@@ -0,0 +1,60 @@
+"""
+JSON codecs, used to encode and decode property values.
+
+A codec is picked once per `Client` (or `BulkInserter`). By default,
+`JsonCodec` is used; `OrjsonCodec` is faster, but does not encode every
+value the same way, so it has to be asked for:
+
+    client = Client(codec=OrjsonCodec())
+"""
+
+import json
+
+class JsonCodec:
+    """Encodes and decodes JSON with the standard library's `json` module."""
+
+    def dumps(self, value):
+        """Encodes `value` as a JSON string."""
+        return json.dumps(value)
+
+    def loads(self, s):
+        """Decodes a JSON string (or UTF-8 bytes)."""
+        return json.loads(s)
+
+class OrjsonCodec(JsonCodec):
+    """
+    Encodes and decodes JSON with `orjson`. Like the standard library, this
+    accepts non-string dictionary keys, and values that `orjson` rejects
+    (integers wider than 64 bits, or `NaN` and `Infinity` literals when
+    decoding) are handled by the `json` module instead.
+
+    It still differs from `JsonCodec` in that `NaN` and infinite floats are
+    encoded as `null`, and integers wider than 64 bits in documents written
+    by other clients are decoded as floats.
+    """
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+        self._options = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, value):
+        try:
+            return self._orjson.dumps(value, option=self._options).decode("utf-8")
+        except TypeError:
+            return json.dumps(value)
+
+    def loads(self, s):
+        try:
+            return self._orjson.loads(s)
+        except self._orjson.JSONDecodeError:
+            return json.loads(s)
+
+_default = None
+
+def default_codec():
+    """Returns the codec used when none is specified."""
+    global _default
+    if _default is None:
+        _default = JsonCodec()
+    return _default
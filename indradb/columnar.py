@@ -0,0 +1,283 @@
+"""
+Conversions between columnar data (NumPy arrays, pyarrow arrays and tables)
+and IndraDB messages, without building per-row `Vertex`/`Edge`/`UUID`
+objects.
+
+Query results can be decoded into columns with `decode_chunk`. In the
+`"numpy"` format, each chunk becomes a dict of column name to NumPy array,
+where UUID columns are `N x 16` `uint8` arrays and string columns are object
+arrays sharing one `str` per distinct value. In the `"arrow"` format, each
+chunk becomes a pyarrow `RecordBatch` with `fixed_size_binary(16)` UUID
+columns and dictionary-encoded type columns (which `RecordBatch.to_pandas()`
+turns into categoricals). Vertices have `id` and `t` columns, edges have
+`outbound_id`, `t` and `inbound_id` columns, and properties are flattened
+into one row per property, with the owner's columns followed by `name` and
+`value`, where `value` holds the raw JSON. Counts are returned as plain
+integers.
+
+UUID columns are anything exposing 16 bytes per row through the buffer
+protocol (e.g. an `N x 16` `uint8` NumPy array, or an `S16` array), or a
+pyarrow `fixed_size_binary(16)` array. Type columns are a single string
+shared by every row, a sequence or NumPy array of strings, or a pyarrow
+string or dictionary array. Neither NumPy nor pyarrow is required unless
+their types are passed in.
+"""
+
+import array
+import itertools
+
+from indradb import proto
+from indradb.prepared import _tag, _varint
+
+UUID_WIDTH = 16
+
+NUMPY = "numpy"
+ARROW = "arrow"
+
+# Number of rows copied out of a column at a time
+_BLOCK_ROWS = 65536
+
+def vertex_items(ids, types):
+    """
+    Lazily yields a `BulkInsertItem` for each vertex in the given `ids` and
+    `types` columns.
+    """
+    count = _uuid_count(ids)
+    _check_length(types, count)
+    return _vertex_items(ids, types)
+
+def _vertex_items(ids, types):
+    for id, t in zip(_uuid_values(ids), _string_values(types)):
+        yield proto.BulkInsertItem(vertex=proto.Vertex(
+            id=proto.Uuid(value=id),
+            t=proto.Identifier(value=t),
+        ))
+
+def edge_items(outbound_ids, types, inbound_ids):
+    """
+    Lazily yields a `BulkInsertItem` for each edge in the given
+    `outbound_ids`, `types` and `inbound_ids` columns.
+    """
+    count = _uuid_count(outbound_ids)
+    if _uuid_count(inbound_ids) != count:
+        raise ValueError("outbound and inbound ID columns have different lengths")
+    _check_length(types, count)
+    return _edge_items(outbound_ids, types, inbound_ids)
+
+def _edge_items(outbound_ids, types, inbound_ids):
+    values = zip(_uuid_values(outbound_ids), _string_values(types), _uuid_values(inbound_ids))
+    for outbound_id, t, inbound_id in values:
+        yield proto.BulkInsertItem(edge=proto.Edge(
+            outbound_id=proto.Uuid(value=outbound_id),
+            t=proto.Identifier(value=t),
+            inbound_id=proto.Uuid(value=inbound_id),
+        ))
+
+def uuid_array(ids):
+    """
+    Converts UUIDs, either an iterable of `uuid.UUID`s or a UUID column,
+    into an `N x 16` `uint8` NumPy array.
+    """
+    import numpy as np
+
+    if _is_arrow(ids) or hasattr(ids, "__buffer__") or isinstance(ids, (bytes, bytearray, memoryview, np.ndarray)):
+        _uuid_count(ids)
+        data = b"".join(_uuid_blocks(ids))
+    else:
+        data = b"".join(id.bytes for id in ids)
+    return np.frombuffer(data, dtype=np.uint8).reshape(-1, UUID_WIDTH)
+
+def specific_vertex_query(ids):
+    """
+    Encodes a serialized `SpecificVertexQuery` for a UUID column, without
+    building a message per ID.
+    """
+    import numpy as np
+
+    ids = uuid_array(ids)
+    uuid_field = proto.Uuid.DESCRIPTOR.fields_by_name["value"].number
+    ids_field = proto.SpecificVertexQuery.DESCRIPTOR.fields_by_name["ids"].number
+    query_field = proto.Query.DESCRIPTOR.fields_by_name["specific_vertex"].number
+
+    # every ID is encoded the same way: the `ids` entry's tag and length,
+    # then the `Uuid` message's tag and length, then the ID itself
+    uuid_prefix = _tag(uuid_field, 2) + bytes([UUID_WIDTH])
+    prefix = _tag(ids_field, 2) + bytes([len(uuid_prefix) + UUID_WIDTH]) + uuid_prefix
+    rows = np.empty((len(ids), len(prefix) + UUID_WIDTH), dtype=np.uint8)
+    rows[:, :len(prefix)] = np.frombuffer(prefix, dtype=np.uint8)
+    rows[:, len(prefix):] = ids
+    body = rows.tobytes()
+    return _tag(query_field, 2) + _varint(len(body)) + body
+
+def _is_arrow(value):
+    return type(value).__module__.startswith("pyarrow")
+
+def _arrow_chunks(column):
+    return column.chunks if hasattr(column, "chunks") else [column]
+
+def _uuid_count(ids):
+    if _is_arrow(ids):
+        for chunk in _arrow_chunks(ids):
+            if getattr(chunk.type, "byte_width", None) != UUID_WIDTH:
+                raise ValueError("UUID columns must be fixed_size_binary({})".format(UUID_WIDTH))
+            if chunk.null_count:
+                raise ValueError("UUID columns cannot contain nulls")
+        return len(ids)
+
+    size = memoryview(ids).nbytes
+    if size % UUID_WIDTH != 0:
+        raise ValueError("UUID columns must hold {} bytes per row".format(UUID_WIDTH))
+    return size // UUID_WIDTH
+
+def _check_length(column, count):
+    if not isinstance(column, str) and hasattr(column, "__len__") and len(column) != count:
+        raise ValueError("columns have different lengths: {} != {}".format(len(column), count))
+
+def _uuid_blocks(ids):
+    """Yields the raw bytes of a UUID column, a block of rows at a time."""
+    if _is_arrow(ids):
+        views = []
+        for chunk in _arrow_chunks(ids):
+            if len(chunk) == 0:
+                continue
+            data = memoryview(chunk.buffers()[1])
+            views.append(data[chunk.offset * UUID_WIDTH:(chunk.offset + len(chunk)) * UUID_WIDTH])
+    else:
+        views = [memoryview(ids).cast("B")]
+
+    step = _BLOCK_ROWS * UUID_WIDTH
+    for view in views:
+        for start in range(0, len(view), step):
+            yield view[start:start + step].tobytes()
+
+def _uuid_values(ids):
+    """Yields the 16 bytes of each UUID in a column."""
+    for block in _uuid_blocks(ids):
+        for start in range(0, len(block), UUID_WIDTH):
+            yield block[start:start + UUID_WIDTH]
+
+def _string_values(column):
+    """Yields each string in a column; a single string is repeated forever."""
+    if isinstance(column, str):
+        return itertools.repeat(column)
+    if _is_arrow(column):
+        return _arrow_string_values(column)
+    if hasattr(column, "tolist"):
+        return _blocked_values(column)
+    return iter(column)
+
+def _arrow_string_values(column):
+    for chunk in _arrow_chunks(column):
+        if hasattr(chunk, "dictionary"):
+            dictionary = chunk.dictionary.to_pylist()
+            for i in _blocked_values(chunk.indices):
+                yield dictionary[i]
+        else:
+            yield from _blocked_values(chunk)
+
+def _blocked_values(column):
+    for start in range(0, len(column), _BLOCK_ROWS):
+        block = column[start:start + _BLOCK_ROWS]
+        yield from (block.to_pylist() if hasattr(block, "to_pylist") else block.tolist())
+
+def decode_chunk(res_chunk, format=NUMPY):
+    """
+    Converts a `QueryOutputValue` message into columns in the given
+    `format`, either `"numpy"` or `"arrow"`.
+    """
+    if format not in (NUMPY, ARROW):
+        raise ValueError("unknown columnar format: {}".format(format))
+
+    variant = res_chunk.WhichOneof("value")
+    if variant is None:
+        raise ValueError("query output has no value")
+    if variant == "count":
+        return res_chunk.count
+
+    if variant == "vertices":
+        builder = _ColumnsBuilder(_VERTEX_COLUMNS)
+        for vertex in res_chunk.vertices.vertices:
+            builder.add_vertex(vertex)
+    elif variant == "edges":
+        builder = _ColumnsBuilder(_EDGE_COLUMNS)
+        for edge in res_chunk.edges.edges:
+            builder.add_edge(edge)
+    elif variant == "vertex_properties":
+        builder = _ColumnsBuilder(_VERTEX_COLUMNS + _PROPERTY_COLUMNS)
+        for item in res_chunk.vertex_properties.vertex_properties:
+            for prop in item.props:
+                builder.add_vertex(item.vertex)
+                builder.add_property(prop)
+    elif variant == "edge_properties":
+        builder = _ColumnsBuilder(_EDGE_COLUMNS + _PROPERTY_COLUMNS)
+        for item in res_chunk.edge_properties.edge_properties:
+            for prop in item.props:
+                builder.add_edge(item.edge)
+                builder.add_property(prop)
+
+    return builder.to_arrow() if format == ARROW else builder.to_numpy()
+
+_VERTEX_COLUMNS = ["id", "t"]
+_EDGE_COLUMNS = ["outbound_id", "t", "inbound_id"]
+_PROPERTY_COLUMNS = ["name", "value"]
+
+class _ColumnsBuilder:
+    """Accumulates query results into raw column buffers."""
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.uuids = {"id": [], "outbound_id": [], "inbound_id": []}
+        self.type_codes = array.array("i")
+        self.type_names = {}
+        self.names = []
+        self.values = []
+
+    def _add_type(self, t):
+        self.type_codes.append(self.type_names.setdefault(t, len(self.type_names)))
+
+    def add_vertex(self, vertex):
+        self.uuids["id"].append(vertex.id.value)
+        self._add_type(vertex.t.value)
+
+    def add_edge(self, edge):
+        self.uuids["outbound_id"].append(edge.outbound_id.value)
+        self._add_type(edge.t.value)
+        self.uuids["inbound_id"].append(edge.inbound_id.value)
+
+    def add_property(self, prop):
+        self.names.append(prop.name.value)
+        self.values.append(prop.value.value)
+
+    def to_numpy(self):
+        import numpy as np
+
+        columns = {}
+        for name in self.columns:
+            if name == "t":
+                names = np.empty(len(self.type_names), dtype=object)
+                names[:] = list(self.type_names)
+                columns[name] = names[np.frombuffer(self.type_codes, dtype=np.int32)]
+            elif name in self.uuids:
+                data = b"".join(self.uuids[name])
+                columns[name] = np.frombuffer(data, dtype=np.uint8).reshape(-1, UUID_WIDTH)
+            else:
+                values = np.empty(len(self.names), dtype=object)
+                values[:] = self.names if name == "name" else self.values
+                columns[name] = values
+        return columns
+
+    def to_arrow(self):
+        import pyarrow as pa
+
+        columns = []
+        for name in self.columns:
+            if name == "t":
+                indices = pa.Array.from_buffers(pa.int32(), len(self.type_codes), [None, pa.py_buffer(self.type_codes)])
+                columns.append(pa.DictionaryArray.from_arrays(indices, pa.array(list(self.type_names), type=pa.string())))
+            elif name in self.uuids:
+                data = pa.py_buffer(b"".join(self.uuids[name]))
+                count = len(data) // UUID_WIDTH
+                columns.append(pa.FixedSizeBinaryArray.from_buffers(pa.binary(UUID_WIDTH), count, [None, data]))
+            else:
+                columns.append(pa.array(self.names if name == "name" else self.values, type=pa.string()))
+        return pa.RecordBatch.from_arrays(columns, names=self.columns)
@@ -0,0 +1,236 @@
+"""
+Graph analytics backed by NumPy arrays: in-process snapshots of a region of
+the graph, held as compressed sparse row (CSR) adjacency arrays, and
+server-side degree counts.
+
+    graph = snapshot(client, AllEdgeQuery())
+    ranks = graph.pagerank()
+    top = graph.id(int(ranks.argmax()))
+
+In a snapshot, vertices are numbered `0..n-1` in UUID order, and edges are
+stored as NumPy arrays rather than `Edge` objects, at about 8 bytes per edge
+and 24 per vertex. NumPy is required.
+"""
+
+import uuid
+
+from indradb.columnar import UUID_WIDTH
+from indradb.models import SpecificVertexQuery, EdgeDirection
+from indradb.prepared import Param
+
+class CSRGraph:
+    """
+    A directed graph in CSR form: the targets of vertex `i`'s outbound edges
+    are `targets[offsets[i]:offsets[i + 1]]`, and their types are
+    `types[edge_types[...]]`. `ids` is the `n x 16` `uint8` array of vertex
+    UUIDs, sorted, so a vertex's number is its row.
+    """
+
+    __slots__ = ["ids", "offsets", "targets", "edge_types", "types"]
+
+    def __init__(self, ids, offsets, targets, edge_types, types):
+        self.ids = ids
+        self.offsets = offsets
+        self.targets = targets
+        self.edge_types = edge_types
+        self.types = types
+
+    @classmethod
+    def from_arrays(cls, outbound_ids, inbound_ids, types, vertex_ids=None):
+        """
+        Builds a graph from edge columns: `N x 16` `uint8` arrays of outbound
+        and inbound IDs, and an array of the edges' type names. `vertex_ids`
+        adds vertices that may have no edges.
+        """
+        import numpy as np
+
+        outbound_ids = _as_uuids(outbound_ids)
+        inbound_ids = _as_uuids(inbound_ids)
+        if len(outbound_ids) != len(inbound_ids) or len(outbound_ids) != len(types):
+            raise ValueError("edge columns have different lengths")
+
+        columns = [outbound_ids, inbound_ids]
+        if vertex_ids is not None:
+            columns.append(_as_uuids(vertex_ids))
+        ids, index = np.unique(np.concatenate(columns), return_inverse=True)
+        index = index.reshape(-1).astype(np.int32)
+        sources = index[:len(outbound_ids)]
+        targets = index[len(outbound_ids):2 * len(outbound_ids)]
+
+        type_names, type_codes = np.unique(np.asarray(types, dtype=object), return_inverse=True)
+
+        order = np.argsort(sources, kind="stable")
+        offsets = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=len(ids)), out=offsets[1:])
+        return cls(
+            ids=ids.view(np.uint8).reshape(-1, UUID_WIDTH),
+            offsets=offsets,
+            targets=targets[order],
+            edge_types=type_codes.reshape(-1).astype(np.int32)[order],
+            types=[str(t) for t in type_names],
+        )
+
+    @property
+    def num_vertices(self):
+        return len(self.offsets) - 1
+
+    @property
+    def num_edges(self):
+        return len(self.targets)
+
+    def id(self, index):
+        """Returns the UUID of vertex number `index`."""
+        return uuid.UUID(bytes=self.ids[index].tobytes())
+
+    def index(self, id):
+        """Returns the number of the vertex with UUID `id`, or -1 if it is absent."""
+        import numpy as np
+
+        keys = self.ids.view("V{}".format(UUID_WIDTH)).reshape(-1)
+        key = np.frombuffer(id.bytes, dtype="V{}".format(UUID_WIDTH))[0]
+        i = int(np.searchsorted(keys, key))
+        return i if i < len(keys) and keys[i] == key else -1
+
+    def sources(self):
+        """Returns the source vertex of each edge, in `targets` order."""
+        import numpy as np
+        return np.repeat(np.arange(self.num_vertices, dtype=np.int32), self.out_degree())
+
+    def neighbors(self, index):
+        """Returns the targets of vertex number `index`'s outbound edges."""
+        return self.targets[self.offsets[index]:self.offsets[index + 1]]
+
+    def out_degree(self):
+        import numpy as np
+        return np.diff(self.offsets)
+
+    def in_degree(self):
+        import numpy as np
+        return np.bincount(self.targets, minlength=self.num_vertices)
+
+    def degree(self):
+        return self.out_degree() + self.in_degree()
+
+    def pagerank(self, damping=0.85, max_iter=100, tol=1e-6):
+        """
+        Computes PageRank by power iteration, returning a `float64` array of
+        ranks that sums to 1. The rank of vertices without outbound edges is
+        spread evenly across every vertex.
+        """
+        import numpy as np
+
+        n = self.num_vertices
+        if n == 0:
+            return np.zeros(0)
+
+        out_degree = self.out_degree()
+        sources = self.sources()
+        dangling = out_degree == 0
+        inverse_degree = np.divide(1.0, out_degree, out=np.zeros(n), where=~dangling)
+        ranks = np.full(n, 1.0 / n)
+
+        for _ in range(max_iter):
+            weights = (ranks * inverse_degree)[sources]
+            spread = (1.0 - damping + damping * ranks[dangling].sum()) / n
+            new_ranks = damping * np.bincount(self.targets, weights=weights, minlength=n) + spread
+            done = np.abs(new_ranks - ranks).sum() < tol
+            ranks = new_ranks
+            if done:
+                break
+        return ranks
+
+    def connected_components(self):
+        """
+        Labels the weakly connected components, returning an `int32` array
+        that maps each vertex to the smallest vertex number in its
+        component.
+        """
+        import numpy as np
+
+        labels = np.arange(self.num_vertices, dtype=np.int32)
+        sources = self.sources()
+        while True:
+            # hook each edge's endpoints onto the smaller label, then shortcut
+            # label chains
+            smallest = np.minimum(labels[sources], labels[self.targets])
+            new_labels = labels.copy()
+            np.minimum.at(new_labels, sources, smallest)
+            np.minimum.at(new_labels, self.targets, smallest)
+            np.minimum.at(new_labels, labels, new_labels)
+            while True:
+                jumped = new_labels[new_labels]
+                if np.array_equal(jumped, new_labels):
+                    break
+                new_labels = jumped
+            if np.array_equal(new_labels, labels):
+                return labels
+            labels = new_labels
+
+def snapshot(client, query):
+    """
+    Streams the results of `query` into a `CSRGraph`. Edges become the
+    graph's edges, and vertices (e.g. from `.include()`) are added even if
+    none of the edges touch them.
+    """
+    import numpy as np
+
+    outbound_ids = []
+    inbound_ids = []
+    types = []
+    vertex_ids = []
+    for columns in client.get_columns(query):
+        if not isinstance(columns, dict):
+            raise ValueError("query returned a count rather than vertices or edges")
+        if "inbound_id" in columns:
+            outbound_ids.append(columns["outbound_id"])
+            inbound_ids.append(columns["inbound_id"])
+            types.append(columns["t"])
+        elif "name" not in columns:
+            vertex_ids.append(columns["id"])
+
+    def concatenate(arrays, dtype, shape):
+        return np.concatenate(arrays) if arrays else np.empty(shape, dtype=dtype)
+
+    return CSRGraph.from_arrays(
+        concatenate(outbound_ids, np.uint8, (0, UUID_WIDTH)),
+        concatenate(inbound_ids, np.uint8, (0, UUID_WIDTH)),
+        concatenate(types, object, (0,)),
+        concatenate(vertex_ids, np.uint8, (0, UUID_WIDTH)),
+    )
+
+def degrees(client, ids, direction=EdgeDirection.OUTBOUND, t=None, max_in_flight=16):
+    """
+    Counts the edges of each vertex in `ids` (UUIDs, or an `N x 16` `uint8`
+    array), returning an `int64` array aligned with `ids`. `direction` is
+    the `EdgeDirection` of the edges to count, or `None` to count both, and
+    `t` only counts edges of that type.
+
+    The server counts each vertex's edges with a `CountQuery`, prepared once
+    and run for up to `max_in_flight` vertices at a time.
+    """
+    import numpy as np
+
+    if hasattr(ids, "shape"):
+        ids = [uuid.UUID(bytes=row.tobytes()) for row in np.asarray(ids, dtype=np.uint8).reshape(-1, UUID_WIDTH)]
+    else:
+        ids = list(ids)
+
+    result = np.zeros(len(ids), dtype=np.int64)
+    directions = (EdgeDirection.OUTBOUND, EdgeDirection.INBOUND) if direction is None else (direction,)
+    for edge_direction in directions:
+        vertex = SpecificVertexQuery(Param("id"))
+        edges = vertex.outbound() if edge_direction == EdgeDirection.OUTBOUND else vertex.inbound()
+        if t is not None:
+            edges = edges.t(t)
+        prepared = client.prepare(edges.count())
+        queries = (prepared.bind(id=id) for id in ids)
+        for i, chunks in enumerate(client.get_many(queries, max_in_flight=max_in_flight)):
+            result[i] += chunks[0]
+    return result
+
+def _as_uuids(ids):
+    """Views an `N x 16` `uint8` array as a 1-d array of 16-byte values."""
+    import numpy as np
+
+    ids = np.ascontiguousarray(ids, dtype=np.uint8).reshape(-1, UUID_WIDTH)
+    return ids.view("V{}".format(UUID_WIDTH)).reshape(-1)
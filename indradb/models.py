@@ -1,15 +1,21 @@
-import json
 import uuid
 from enum import Enum
 
 from indradb import proto
+from indradb.codec import default_codec
 
 MAX_LIMIT = 2 ** 32 - 1
 _SENTINAL = object()
+_UNDECODED = object()
 
 class _BaseModel(object):
+    @property
+    def _fields(self):
+        """The attributes compared for equality."""
+        return self.__slots__
+
     def __eq__(self, other):
-        for key in self.__slots__:
+        for key in self._fields:
             if getattr(self, key) != getattr(other, key, _SENTINAL):
                 return False
 
@@ -79,7 +85,131 @@ class Vertex(_BaseModel):
             t=message.t.value
         )
 
-class _Query(_BaseModel):
+class EdgeView(_BaseModel):
+    """
+    A read-only `Edge` backed by its protobuf message, which decodes each
+    field on first access. Views compare equal to the equivalent `Edge`.
+    """
+
+    __slots__ = ["_message", "_outbound_id", "_inbound_id"]
+    _fields = Edge.__slots__
+
+    def __init__(self, message):
+        self._message = message
+        self._outbound_id = None
+        self._inbound_id = None
+
+    @property
+    def outbound_id(self):
+        if self._outbound_id is None:
+            self._outbound_id = uuid.UUID(bytes=self._message.outbound_id.value)
+        return self._outbound_id
+
+    @property
+    def t(self):
+        return self._message.t.value
+
+    @property
+    def inbound_id(self):
+        if self._inbound_id is None:
+            self._inbound_id = uuid.UUID(bytes=self._message.inbound_id.value)
+        return self._inbound_id
+
+    def to_message(self):
+        return self._message
+
+    def to_model(self):
+        """Fully decodes the view into an `Edge`."""
+        return Edge(self.outbound_id, self.t, self.inbound_id)
+
+    @classmethod
+    def from_message(cls, message):
+        return cls(message)
+
+class VertexView(_BaseModel):
+    """
+    A read-only `Vertex` backed by its protobuf message, which decodes each
+    field on first access. Views compare equal to the equivalent `Vertex`.
+    """
+
+    __slots__ = ["_message", "_id"]
+    _fields = Vertex.__slots__
+
+    def __init__(self, message):
+        self._message = message
+        self._id = None
+
+    @property
+    def id(self):
+        if self._id is None:
+            self._id = uuid.UUID(bytes=self._message.id.value)
+        return self._id
+
+    @property
+    def t(self):
+        return self._message.t.value
+
+    def to_message(self):
+        return self._message
+
+    def to_model(self):
+        """Fully decodes the view into a `Vertex`."""
+        return Vertex(self.id, self.t)
+
+    @classmethod
+    def from_message(cls, message):
+        return cls(message)
+
+class _BaseQuery(_BaseModel):
+    """
+    Base for queries. Queries are immutable and hashable: builder methods
+    return a new query rather than changing this one, so a query's encoded
+    form can be computed once and reused.
+    """
+
+    def __setattr__(self, key, value):
+        if hasattr(self, key):
+            raise AttributeError("queries are immutable")
+        object.__setattr__(self, key, value)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and super().__eq__(other)
+
+    def __hash__(self):
+        return hash((type(self), tuple(_freeze(getattr(self, key)) for key in self._fields)))
+
+    def _replace(self, **changes):
+        """Returns a copy of this query with some attributes changed."""
+        query = self.__class__.__new__(self.__class__)
+        for key in self.__slots__:
+            object.__setattr__(query, key, changes.get(key, getattr(self, key)))
+        return query
+
+    def to_bytes(self, codec=None):
+        """
+        Serializes the query's message. The result is cached, so repeatedly
+        sending the same query only encodes it once.
+        """
+        codec = codec or default_codec()
+        cached = getattr(self, "_encoded", None)
+        if cached is None or cached[0] is not codec:
+            cached = (codec, self.to_message(codec).SerializeToString())
+            object.__setattr__(self, "_encoded", cached)
+        return cached[1]
+
+def _freeze(value):
+    """Converts a query attribute into something hashable."""
+    if isinstance(value, _BaseQuery):
+        return value
+    if isinstance(value, _BaseModel):
+        return tuple(_freeze(getattr(value, key)) for key in value._fields)
+    if isinstance(value, dict):
+        return frozenset((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+class _Query(_BaseQuery):
     def outbound(self):
         """Gets the outbound vertices or edges associated with this query."""
         return PipeQuery(self, EdgeDirection.OUTBOUND)
@@ -137,15 +267,19 @@ class _Query(_BaseModel):
         return IncludeQuery(self)
 
 class _CountQuery:
+    __slots__ = []
+
     def count(self):
         return CountQuery(self)
 
 class AllVertexQuery(_Query, _CountQuery):
     """Gets all vertices."""
-    def to_message(self):
+    __slots__ = []
+
+    def to_message(self, codec=None):
         return proto.Query(all_vertex=proto.google_dot_protobuf_dot_empty__pb2.Empty())
 
-class RangeVertexQuery(_Query):
+class RangeVertexQuery(_Query, _CountQuery):
     __slots__ = ["_limit", "_start_id", "_t"]
 
     def __init__(self):
@@ -154,18 +288,15 @@ class RangeVertexQuery(_Query):
         self._t = None
 
     def limit(self, value):
-        self._limit = value
-        return self
+        return self._replace(_limit=value)
 
     def start_id(self, value):
-        self._start_id = value
-        return self
+        return self._replace(_start_id=value)
 
     def t(self, value):
-        self._t = value
-        return self
+        return self._replace(_t=value)
 
-    def to_message(self):
+    def to_message(self, codec=None):
         return proto.Query(
             range_vertex=proto.RangeVertexQuery(
                 limit=self._limit,
@@ -174,80 +305,82 @@ class RangeVertexQuery(_Query):
             ),
         )
 
-class SpecificVertexQuery(_Query):
+class SpecificVertexQuery(_Query, _CountQuery):
     """Gets a specific set of vertices."""
     __slots__ = ["_ids"]
 
     def __init__(self, *ids):
         self._ids = ids
 
-    def to_message(self):
+    def to_message(self, codec=None):
         return proto.Query(
             specific_vertex=proto.SpecificVertexQuery(ids=[proto.Uuid(value=i.bytes) for i in self._ids]),
         )
 
-class VertexWithPropertyPresenceQuery(_Query):
+class VertexWithPropertyPresenceQuery(_Query, _CountQuery):
     """Gets vertices with or without a given property."""
     __slots__ = ["_name"]
 
     def __init__(self, name):
         self._name = name
 
-    def to_message(self):
+    def to_message(self, codec=None):
         return proto.Query(
             vertex_with_property_presence=proto.VertexWithPropertyPresenceQuery(
                 name=proto.Identifier(value=self._name),
             ),
         )
 
-class VertexWithPropertyValueQuery(_Query):
+class VertexWithPropertyValueQuery(_Query, _CountQuery):
     """Gets vertices with a property equal to a given value."""
     __slots__ = ["_name", "_value"]
 
-    def __init__(self, _name, _value):
+    def __init__(self, name, value):
         self._name = name
         self._value = value
 
-    def to_message(self):
+    def to_message(self, codec=None):
         return proto.Query(
             vertex_with_property_value=proto.VertexWithPropertyValueQuery(
                 name=proto.Identifier(value=self._name),
-                value=json.dumps(self._value),
+                value=proto.Json(value=(codec or default_codec()).dumps(self._value)),
             ),
         )
 
 class AllEdgeQuery(_Query, _CountQuery):
     """Gets all edges."""
-    def to_message(self):
+    __slots__ = []
+
+    def to_message(self, codec=None):
         return proto.Query(all_edge=proto.google_dot_protobuf_dot_empty__pb2.Empty())
 
-class SpecificEdgeQuery(_Query):
+class SpecificEdgeQuery(_Query, _CountQuery):
     """Gets a specific set of edges."""
     __slots__ = ["_edges"]
 
     def __init__(self, *edges):
         self._edges = edges
 
-    def to_message(self):
+    def to_message(self, codec=None):
         return proto.Query(
             specific_edge=proto.SpecificEdgeQuery(edges=[e.to_message() for e in self._edges]),
         )
 
-class EdgeWithPropertyPresenceQuery(_Query):
+class EdgeWithPropertyPresenceQuery(_Query, _CountQuery):
     """Gets edges with or without a given property."""
     __slots__ = ["_name"]
 
     def __init__(self, name):
         self._name = name
 
-    def to_message(self):
+    def to_message(self, codec=None):
         return proto.Query(
             edge_with_property_presence=proto.EdgeWithPropertyPresenceQuery(
                 name=proto.Identifier(value=self._name),
             ),
         )
 
-class EdgeWithPropertyValueQuery(_Query):
+class EdgeWithPropertyValueQuery(_Query, _CountQuery):
     """Gets edges with a property equal to a given value."""
     __slots__ = ["_name", "_value"]
 
@@ -255,15 +388,15 @@ class EdgeWithPropertyValueQuery(_Query):
         self._name = name
         self._value = value
 
-    def to_message(self):
+    def to_message(self, codec=None):
         return proto.Query(
             edge_with_property_value=proto.EdgeWithPropertyValueQuery(
                 name=proto.Identifier(value=self._name),
-                value=json.dumps(self._value),
+                value=proto.Json(value=(codec or default_codec()).dumps(self._value)),
             ),
         )
 
-class PipeQuery(_Query):
+class PipeQuery(_Query, _CountQuery):
     """
     Gets the vertices associated with edges, or edges associated with
     vertices.
@@ -280,17 +413,15 @@ class PipeQuery(_Query):
         self._t = None
 
     def limit(self, value):
-        self._limit = value
-        return self
+        return self._replace(_limit=value)
 
     def t(self, value):
-        self._t = value
-        return self
+        return self._replace(_t=value)
 
-    def to_message(self):
+    def to_message(self, codec=None):
         return proto.Query(
             pipe=proto.PipeQuery(
-                inner=self._inner.to_message(),
+                inner=self._inner.to_message(codec),
                 direction=self._direction.value,
                 limit=self._limit,
                 t=proto.Identifier(value=self._t) if self._t is not None else None,
@@ -306,18 +437,17 @@ class PipePropertyQuery(_Query, _CountQuery):
         self._name = None
 
     def name(self, value):
-        self._name = value
-        return self
+        return self._replace(_name=value)
 
-    def to_message(self):
+    def to_message(self, codec=None):
         return proto.Query(
             pipe_property=proto.PipePropertyQuery(
-                inner=self._inner.to_message(),
+                inner=self._inner.to_message(codec),
                 name=proto.Identifier(value=self._name) if self._name is not None else None,
             )
         )
 
-class PipeWithPropertyPresenceQuery(_Query):
+class PipeWithPropertyPresenceQuery(_Query, _CountQuery):
     """Gets vertices or edges with or without a property."""
     __slots__ = ["_inner", "_name", "_exists"]
 
@@ -326,16 +456,16 @@ class PipeWithPropertyPresenceQuery(_Query):
         self._name = name
         self._exists = exists
 
-    def to_message(self):
+    def to_message(self, codec=None):
         return proto.Query(
             pipe_with_property_presence=proto.PipeWithPropertyPresenceQuery(
-                inner=self._inner.to_message(),
+                inner=self._inner.to_message(codec),
                 name=proto.Identifier(value=self._name),
                 exists=self._exists,
             ),
         )
 
-class PipeWithPropertyValueQuery(_Query):
+class PipeWithPropertyValueQuery(_Query, _CountQuery):
     """Gets vertices or edges with a property equal to a given value."""
     __slots__ = ["_inner", "_name", "_value", "_equal"]
 
@@ -345,12 +475,12 @@ class PipeWithPropertyValueQuery(_Query):
         self._value = value
         self._equal = equal
 
-    def to_message(self):
+    def to_message(self, codec=None):
         return proto.Query(
             pipe_with_property_value=proto.PipeWithPropertyValueQuery(
-                inner=self._inner.to_message(),
+                inner=self._inner.to_message(codec),
                 name=proto.Identifier(value=self._name),
-                value=json.dumps(self._value),
+                value=proto.Json(value=(codec or default_codec()).dumps(self._value)),
                 equal=self._equal,
             ),
         )
@@ -367,33 +497,94 @@ class IncludeQuery(_Query):
     def __init__(self, inner):
         self._inner = inner
 
-    def to_message(self):
+    def to_message(self, codec=None):
         return proto.Query(
             include=proto.IncludeQuery(
-                inner=self._inner.to_message(),
+                inner=self._inner.to_message(codec),
             ),
         )
 
-class CountQuery:
+class CountQuery(_BaseQuery):
     """Counts the number of items returned from a query."""
     __slots__ = ["_inner"]
 
     def __init__(self, inner):
         self._inner = inner
 
-    def to_message(self):
+    def to_message(self, codec=None):
         return proto.Query(
             count=proto.CountQuery(
-                inner=self._inner.to_message(),
+                inner=self._inner.to_message(codec),
             ),
         )
 
+def _split_query(query, max_ids):
+    """
+    Splits a query built on a `SpecificVertexQuery` or `SpecificEdgeQuery`
+    with more than `max_ids` IDs into queries over at most `max_ids` IDs
+    each, whose results together are the original query's results. Queries
+    that cannot be split that way, e.g. because a pipe has a limit, are
+    returned as they are.
+    """
+    chain = [query]
+    while hasattr(chain[-1], "_inner"):
+        chain.append(chain[-1]._inner)
+
+    root = chain[-1]
+    if isinstance(root, SpecificVertexQuery):
+        key = "_ids"
+    elif isinstance(root, SpecificEdgeQuery):
+        key = "_edges"
+    else:
+        return [query]
+
+    values = getattr(root, key)
+    if max_ids is None or len(values) <= max_ids:
+        return [query]
+    # a limit applies to all of the results, not to each part's
+    if any(getattr(q, "_limit", MAX_LIMIT) != MAX_LIMIT for q in chain):
+        return [query]
+
+    parts = []
+    for i in range(0, len(values), max_ids):
+        part = root._replace(**{key: values[i:i + max_ids]})
+        for outer in reversed(chain[:-1]):
+            part = outer._replace(_inner=part)
+        parts.append(part)
+    return parts
+
 class EdgeDirection(Enum):
     OUTBOUND = proto.OUTBOUND
     INBOUND = proto.INBOUND
 
-class NamedProperty(_BaseModel):
-    __slots__ = ["name", "value"]
+class _DeferredValue(object):
+    """
+    Mixin for properties with a JSON `value`. When built from a message, the
+    raw JSON is kept and only decoded the first time `value` is read.
+    """
+
+    __slots__ = []
+
+    def _defer_value(self, message, codec):
+        self._value = _UNDECODED
+        self._raw_value = message.value.value
+        self._codec = codec
+
+    @property
+    def value(self):
+        if self._value is _UNDECODED:
+            self._value = (self._codec or default_codec()).loads(self._raw_value)
+            self._raw_value = None
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+        self._raw_value = None
+
+class NamedProperty(_DeferredValue, _BaseModel):
+    __slots__ = ["name", "_value", "_raw_value", "_codec"]
+    _fields = ["name", "value"]
 
     def __init__(self, name, value):
         """
@@ -405,18 +596,19 @@ class NamedProperty(_BaseModel):
         self.value = value
 
     @classmethod
-    def from_message(cls, message):
-        return cls(
-            name=message.name.value,
-            value=json.loads(message.value.value),
-        )
+    def from_message(cls, message, codec=None):
+        prop = cls.__new__(cls)
+        prop.name = message.name.value
+        prop._defer_value(message, codec)
+        return prop
 
-class VertexProperty(_BaseModel):
+class VertexProperty(_DeferredValue, _BaseModel):
     """
     Property attached to a vertex
     """
 
-    __slots__ = ["id", "value"]
+    __slots__ = ["id", "_value", "_raw_value", "_codec"]
+    _fields = ["id", "value"]
 
     def __init__(self, id, value):
         """
@@ -430,11 +622,11 @@ class VertexProperty(_BaseModel):
         self.value = value
 
     @classmethod
-    def from_message(cls, message):
-        return cls(
-            id=uuid.UUID(bytes=message.id.value),
-            value=json.loads(message.value.value)
-        )
+    def from_message(cls, message, codec=None):
+        prop = cls.__new__(cls)
+        prop.id = uuid.UUID(bytes=message.id.value)
+        prop._defer_value(message, codec)
+        return prop
 
 class VertexProperties(_BaseModel):
     """
@@ -453,10 +645,10 @@ class VertexProperties(_BaseModel):
         self.props = props
 
     @classmethod
-    def from_message(cls, message):
+    def from_message(cls, message, codec=None):
         return cls(
             vertex=Vertex.from_message(message.vertex),
-            props=[NamedProperty.from_message(p) for p in message.props],
+            props=[NamedProperty.from_message(p, codec) for p in message.props],
         )
 
     def __eq__(self, other):
@@ -467,12 +659,13 @@ class VertexProperties(_BaseModel):
             return False
         return all(a == b for a, b in zip(self.props, other.props))
 
-class EdgeProperty(_BaseModel):
+class EdgeProperty(_DeferredValue, _BaseModel):
     """
     Property attached to an edge
     """
 
-    __slots__ = ["edge", "value"]
+    __slots__ = ["edge", "_value", "_raw_value", "_codec"]
+    _fields = ["edge", "value"]
 
     def __init__(self, edge, value):
         """
@@ -486,11 +679,11 @@ class EdgeProperty(_BaseModel):
         self.value = value
 
     @classmethod
-    def from_message(cls, message):
-        return cls(
-            edge=Edge.from_message(message.edge),
-            value=json.loads(message.value.value),
-        )
+    def from_message(cls, message, codec=None):
+        prop = cls.__new__(cls)
+        prop.edge = Edge.from_message(message.edge)
+        prop._defer_value(message, codec)
+        return prop
 
 class EdgeProperties(_BaseModel):
     """
@@ -509,10 +702,10 @@ class EdgeProperties(_BaseModel):
         self.props = props
 
     @classmethod
-    def from_message(cls, message):
+    def from_message(cls, message, codec=None):
         return cls(
             edge=Edge.from_message(message.edge),
-            props=[NamedProperty.from_message(p) for p in message.props],
+            props=[NamedProperty.from_message(p, codec) for p in message.props],
         )
 
     def __eq__(self, other):
@@ -522,3 +715,71 @@ class EdgeProperties(_BaseModel):
         if len(self.props) != len(other_props):
             return False
         return all(a == b for a, b in zip(self.props, other.props))
+
+class VertexPropertiesView(_BaseModel):
+    """
+    A read-only `VertexProperties` backed by its protobuf message, which
+    decodes the vertex and properties on first access.
+    """
+
+    __slots__ = ["_message", "_codec", "_props"]
+    _fields = VertexProperties.__slots__
+
+    def __init__(self, message, codec=None):
+        self._message = message
+        self._codec = codec
+        self._props = None
+
+    @property
+    def vertex(self):
+        return VertexView(self._message.vertex)
+
+    @property
+    def props(self):
+        if self._props is None:
+            self._props = [NamedProperty.from_message(p, self._codec) for p in self._message.props]
+        return self._props
+
+    def to_model(self):
+        """Fully decodes the view into a `VertexProperties`."""
+        return VertexProperties(self.vertex.to_model(), self.props)
+
+    @classmethod
+    def from_message(cls, message, codec=None):
+        return cls(message, codec)
+
+    __eq__ = VertexProperties.__eq__
+
+class EdgePropertiesView(_BaseModel):
+    """
+    A read-only `EdgeProperties` backed by its protobuf message, which
+    decodes the edge and properties on first access.
+    """
+
+    __slots__ = ["_message", "_codec", "_props"]
+    _fields = EdgeProperties.__slots__
+
+    def __init__(self, message, codec=None):
+        self._message = message
+        self._codec = codec
+        self._props = None
+
+    @property
+    def edge(self):
+        return EdgeView(self._message.edge)
+
+    @property
+    def props(self):
+        if self._props is None:
+            self._props = [NamedProperty.from_message(p, self._codec) for p in self._message.props]
+        return self._props
+
+    def to_model(self):
+        """Fully decodes the view into an `EdgeProperties`."""
+        return EdgeProperties(self.edge.to_model(), self.props)
+
+    @classmethod
+    def from_message(cls, message, codec=None):
+        return cls(message, codec)
+
+    __eq__ = EdgeProperties.__eq__
@@ -0,0 +1,242 @@
+"""
+Prepared queries: a query is compiled once, with `Param` placeholders for
+the values that change between calls, and each call only encodes the bound
+values and splices them into the pre-encoded message.
+
+    follows = client.prepare(
+        SpecificVertexQuery(Param("id")).outbound().t("follows")
+            .with_property_equal_to("active", Param("active"))
+    )
+    for chunk in client.get(follows.bind(id=user_id, active=True)):
+        ...
+
+Parameters can stand in for vertex and edge IDs, types, property names,
+limits and property values.
+"""
+
+import os
+import uuid
+
+from google.protobuf.descriptor import FieldDescriptor
+
+from indradb import proto
+from indradb.codec import default_codec
+from indradb.models import _BaseQuery, Edge
+
+_UUID = "uuid"
+_IDENTIFIER = "identifier"
+_LIMIT = "limit"
+_JSON = "json"
+
+# The kind of value held by each model attribute that can be parameterized
+_SLOT_KINDS = {
+    "_ids": _UUID,
+    "_start_id": _UUID,
+    "outbound_id": _UUID,
+    "inbound_id": _UUID,
+    "_t": _IDENTIFIER,
+    "t": _IDENTIFIER,
+    "_name": _IDENTIFIER,
+    "_limit": _LIMIT,
+    "_value": _JSON,
+}
+
+class Param:
+    """A named placeholder in a query, bound when the query is executed."""
+
+    __slots__ = ["name"]
+
+    def __init__(self, name):
+        self.name = name
+
+    def __eq__(self, other):
+        return isinstance(other, Param) and self.name == other.name
+
+    def __hash__(self):
+        return hash((Param, self.name))
+
+    def __repr__(self):
+        return "Param({!r})".format(self.name)
+
+class PreparedQuery:
+    """A query compiled into a template, with parameters bound per call."""
+
+    def __init__(self, query, codec=None):
+        """
+        Compiles a query containing `Param` placeholders. `codec` is the JSON
+        codec used for property values.
+        """
+        self.codec = codec or default_codec()
+        sentinels = _Sentinels(self.codec)
+        message = _substitute(query, None, sentinels).to_message(self.codec)
+        self.params = frozenset(sentinels.kinds)
+        self._parts = _compile(message, sentinels.holes)
+
+    def bind(self, **values):
+        """
+        Binds a value to every parameter, returning a `BoundQuery` that can be
+        passed to `Client.get`, `Client.delete`, etc.
+        """
+        missing = self.params.difference(values)
+        if missing:
+            raise ValueError("missing values for parameters: {}".format(", ".join(sorted(missing))))
+        unknown = set(values).difference(self.params)
+        if unknown:
+            raise ValueError("unknown parameters: {}".format(", ".join(sorted(unknown))))
+        return BoundQuery(_render(self._parts, values, self.codec))
+
+class BoundQuery:
+    """An encoded query produced by `PreparedQuery.bind`."""
+
+    __slots__ = ["_encoded"]
+
+    def __init__(self, encoded):
+        self._encoded = encoded
+
+    def to_bytes(self, codec=None):
+        return self._encoded
+
+    def to_message(self, codec=None):
+        return proto.Query.FromString(self._encoded)
+
+class _Sentinels:
+    """
+    Generates unique stand-in values for parameters, so that they can be found
+    in the query's encoded message.
+    """
+
+    def __init__(self, codec):
+        self.codec = codec
+        self.kinds = {}
+        self.values = {}
+        # maps the encoded form of a sentinel to its hole
+        self.holes = {}
+
+    def get(self, param, kind):
+        if self.kinds.setdefault(param.name, kind) != kind:
+            raise ValueError("parameter {} is used for different kinds of values".format(param.name))
+        if param.name in self.values:
+            return self.values[param.name]
+
+        while True:
+            if kind == _UUID:
+                value = uuid.UUID(bytes=os.urandom(16))
+                encoded = value.bytes
+            elif kind == _LIMIT:
+                value = encoded = 2 ** 31 + int.from_bytes(os.urandom(4), "big") % (2 ** 31 - 1)
+            else:
+                value = "\x00indradb-param-" + os.urandom(8).hex()
+                encoded = self.codec.dumps(value) if kind == _JSON else value
+            if encoded not in self.holes:
+                break
+
+        self.values[param.name] = value
+        self.holes[encoded] = (param.name, kind)
+        return value
+
+def _substitute(value, slot, sentinels):
+    """Replaces the parameters in a query tree with sentinel values."""
+    if isinstance(value, Param):
+        if slot not in _SLOT_KINDS:
+            raise ValueError("{} cannot be parameterized".format(slot))
+        return sentinels.get(value, _SLOT_KINDS[slot])
+    if isinstance(value, _BaseQuery):
+        return value._replace(**{key: _substitute(getattr(value, key), key, sentinels) for key in value.__slots__})
+    if isinstance(value, Edge):
+        return Edge(*(_substitute(getattr(value, key), key, sentinels) for key in Edge.__slots__))
+    if isinstance(value, tuple):
+        return tuple(_substitute(v, slot, sentinels) for v in value)
+    return value
+
+class _Hole:
+    """A parameterized scalar field in a template."""
+
+    __slots__ = ["tag", "name", "kind"]
+
+    def __init__(self, tag, name, kind):
+        self.tag = tag
+        self.name = name
+        self.kind = kind
+
+    def render(self, value, codec):
+        if self.kind == _LIMIT:
+            return self.tag + _varint(value)
+        if self.kind == _UUID:
+            data = value.bytes
+        elif self.kind == _JSON:
+            data = codec.dumps(value).encode("utf-8")
+        else:
+            data = value.encode("utf-8")
+        return self.tag + _varint(len(data)) + data
+
+class _Nested:
+    """A message field in a template that contains parameters."""
+
+    __slots__ = ["tag", "parts"]
+
+    def __init__(self, tag, parts):
+        self.tag = tag
+        self.parts = parts
+
+def _compile(message, holes):
+    """
+    Converts a message into a list of template parts: encoded bytes for
+    fields without parameters, `_Hole`s and `_Nested` messages otherwise.
+    """
+    parts = []
+    for field, value in message.ListFields():
+        values = value if field.label == FieldDescriptor.LABEL_REPEATED else [value]
+        for v in values:
+            if field.type == FieldDescriptor.TYPE_MESSAGE:
+                tag = _tag(field.number, 2)
+                nested = _compile(v, holes)
+                if all(isinstance(p, bytes) for p in nested):
+                    data = b"".join(nested)
+                    parts.append(tag + _varint(len(data)) + data)
+                else:
+                    parts.append(_Nested(tag, nested))
+            elif not isinstance(v, bool) and v in holes:
+                wire_type = 0 if field.type == FieldDescriptor.TYPE_UINT32 else 2
+                parts.append(_Hole(_tag(field.number, wire_type), *holes[v]))
+            else:
+                parts.append(_encode_scalar(field, v))
+    return _merge(parts)
+
+def _merge(parts):
+    """Joins adjacent encoded parts."""
+    merged = []
+    for part in parts:
+        if isinstance(part, bytes) and merged and isinstance(merged[-1], bytes):
+            merged[-1] += part
+        else:
+            merged.append(part)
+    return merged
+
+def _render(parts, values, codec):
+    out = []
+    for part in parts:
+        if isinstance(part, bytes):
+            out.append(part)
+        elif isinstance(part, _Hole):
+            out.append(part.render(values[part.name], codec))
+        else:
+            data = _render(part.parts, values, codec)
+            out.append(part.tag + _varint(len(data)) + data)
+    return b"".join(out)
+
+def _encode_scalar(field, value):
+    if field.type in (FieldDescriptor.TYPE_STRING, FieldDescriptor.TYPE_BYTES):
+        data = value.encode("utf-8") if isinstance(value, str) else value
+        return _tag(field.number, 2) + _varint(len(data)) + data
+    return _tag(field.number, 0) + _varint(int(value))
+
+def _tag(number, wire_type):
+    return _varint((number << 3) | wire_type)
+
+def _varint(value):
+    out = bytearray()
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
@@ -0,0 +1,220 @@
+"""
+Parallel scans over every vertex, by splitting the UUID space into ranges
+that are read concurrently with `RangeVertexQuery`.
+
+    for chunk in scan_vertices(client, partitions=16):
+        for vertex in chunk:
+            ...
+
+Vertices are returned in pages, one list per `Get` call. `scan_partitions`
+returns one `VertexCursor` per range instead, e.g. to hand each range to its
+own process, or to checkpoint each range's progress.
+"""
+
+import uuid
+import queue
+import threading
+
+from indradb.client import _decode_chunk
+from indradb.models import RangeVertexQuery, Vertex, VertexView
+
+# Number of distinct UUIDs
+_UUID_SPACE = 1 << 128
+
+def partition_bounds(partitions):
+    """
+    Splits the UUID space into `partitions` equal ranges, returning a list of
+    `(start, end)` pairs, where `start` is inclusive, `end` is exclusive, and
+    the last range's `end` is `None`.
+    """
+    if partitions < 1:
+        raise ValueError("partitions must be at least 1")
+    starts = [uuid.UUID(int=i * _UUID_SPACE // partitions) for i in range(partitions)]
+    return list(zip(starts, starts[1:] + [None]))
+
+class VertexCursor:
+    """
+    Pages through the vertices with IDs from `start` (inclusive) up to `end`
+    (exclusive) with `RangeVertexQuery`, yielding a list of vertices per
+    page.
+
+    While a page is being processed, the next one is fetched on the client's
+    `executor`. The cursor's position only moves past a page once the next
+    one is requested, so a scan restored from a `checkpoint` repeats the
+    page that was being processed rather than skipping it. Iterating over a
+    cursor again continues from its position.
+    """
+
+    def __init__(self, client, start=None, end=None, t=None, page_size=1000, lazy=False, prefetch=True):
+        """
+        Creates a cursor. `t` only returns vertices of that type, `lazy`
+        returns views rather than models (see `Client.get`), and `prefetch`
+        can be turned off to fetch each page only when it is needed.
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+
+        self.client = client
+        self.start = start
+        self.end = end
+        self.t = t
+        self.page_size = page_size
+        self.lazy = lazy
+        self.prefetch = prefetch
+        self.done = False
+
+    def checkpoint(self):
+        """Returns the cursor's position as a JSON-serializable dict."""
+        return {
+            "start": str(self.start) if self.start is not None else None,
+            "end": str(self.end) if self.end is not None else None,
+            "t": self.t,
+            "page_size": self.page_size,
+            "done": self.done,
+        }
+
+    @classmethod
+    def restore(cls, client, checkpoint, **kwargs):
+        """
+        Creates a cursor that resumes from a `checkpoint`. Other arguments
+        (`lazy`, `prefetch`) are passed to the constructor.
+        """
+        cursor = cls(
+            client,
+            start=uuid.UUID(checkpoint["start"]) if checkpoint["start"] is not None else None,
+            end=uuid.UUID(checkpoint["end"]) if checkpoint["end"] is not None else None,
+            t=checkpoint["t"],
+            page_size=checkpoint["page_size"],
+            **kwargs
+        )
+        cursor.done = checkpoint["done"]
+        return cursor
+
+    def __iter__(self):
+        pending = None
+        try:
+            while not self.done:
+                if pending is None:
+                    page, next_start = self._fetch(self.start)
+                else:
+                    page, next_start = pending.result()
+                    pending = None
+                if next_start is not None and self.prefetch:
+                    pending = self.client.executor.submit(self._fetch, next_start)
+                if page:
+                    yield page
+                self.start = next_start
+                self.done = next_start is None
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    def _fetch(self, start):
+        """
+        Fetches the page beginning at `start`, returning its vertices and the
+        start of the next page, or `None` if this is the last one.
+        """
+        query = RangeVertexQuery().limit(self.page_size)
+        if self.t is not None:
+            query = query.t(self.t)
+        if start is not None:
+            query = query.start_id(start)
+
+        end_bytes = self.end.bytes if self.end is not None else None
+        page = []
+        count = 0
+        last = None
+        for res_chunk in self.client._get_chunks(query.to_bytes(self.client.codec)):
+            vertices = res_chunk.vertices.vertices
+            count += len(vertices)
+            if not vertices:
+                continue
+            last = vertices[-1].id.value
+            if end_bytes is not None and last >= end_bytes:
+                # leave out the vertices past the end of the range; the
+                # message itself may be shared through the client's cache,
+                # so it is not trimmed in place
+                keep = 0
+                while vertices[keep].id.value < end_bytes:
+                    keep += 1
+                cls = VertexView if self.lazy else Vertex
+                page.extend(cls.from_message(item) for item in vertices[:keep])
+                return page, None
+            page.extend(_decode_chunk(res_chunk, self.lazy, self.client.codec))
+
+        if count < self.page_size or last is None:
+            return page, None
+        next_id = int.from_bytes(last, "big") + 1
+        return page, uuid.UUID(int=next_id) if next_id < _UUID_SPACE else None
+
+def scan_range(client, start=None, end=None, t=None, page_size=1000, lazy=False):
+    """
+    Returns a `VertexCursor` over the vertices with IDs from `start`
+    (inclusive) up to `end` (exclusive), optionally only those of type `t`,
+    reading `page_size` vertices per `Get` call.
+    """
+    return VertexCursor(client, start, end, t=t, page_size=page_size, lazy=lazy)
+
+def scan_partitions(client, partitions=8, t=None, page_size=1000, lazy=False):
+    """
+    Splits the UUID space into `partitions` ranges, returning a
+    `VertexCursor` for each one.
+    """
+    return [
+        scan_range(client, start, end, t=t, page_size=page_size, lazy=lazy)
+        for start, end in partition_bounds(partitions)
+    ]
+
+def scan_vertices(client, partitions=8, t=None, page_size=1000, lazy=False):
+    """
+    Scans every vertex (of type `t`, if given), reading `partitions` ranges
+    of the UUID space concurrently. Pages are yielded as they arrive, so
+    vertices are not in ID order.
+    """
+    return _merge(scan_partitions(client, partitions, t=t, page_size=page_size, lazy=lazy))
+
+# Tags for the entries of a merged stream's queue
+_CHUNK = 0
+_ERROR = 1
+_DONE = 2
+
+def _merge(streams):
+    """Reads each stream on its own thread, yielding items as they arrive."""
+    results = queue.Queue(maxsize=2 * len(streams))
+    stop = threading.Event()
+
+    def put(entry):
+        while not stop.is_set():
+            try:
+                results.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def drain(stream):
+        try:
+            for item in stream:
+                if not put((_CHUNK, item)):
+                    return
+        except Exception as e:
+            put((_ERROR, e))
+        finally:
+            put((_DONE, None))
+
+    threads = [threading.Thread(target=drain, args=(s,), daemon=True) for s in streams]
+    for thread in threads:
+        thread.start()
+
+    remaining = len(threads)
+    try:
+        while remaining:
+            tag, value = results.get()
+            if tag == _CHUNK:
+                yield value
+            elif tag == _ERROR:
+                raise value
+            else:
+                remaining -= 1
+    finally:
+        stop.set()
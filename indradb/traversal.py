@@ -0,0 +1,328 @@
+"""
+Client-side graph traversals that expand a whole frontier of vertices per
+round trip, rather than calling `Client.get` once per vertex.
+
+    hood = neighborhood(client, user_id, hops=2, t="follows")
+    for edge in hood.edges:
+        ...
+
+Each level is fetched with batched `SpecificVertexQuery(...).outbound()`
+(or `.inbound()`) queries, split into batches of `batch_size` vertices to
+keep messages small, and run concurrently through `Client.get_many`.
+"""
+
+import time
+import uuid
+import random
+import itertools
+
+import grpc
+
+from indradb.models import SpecificVertexQuery, EdgeDirection, Vertex, VertexView
+
+class Neighborhood:
+    """
+    The vertices and edges reached by a traversal. `levels` lists the IDs
+    first reached at each depth, starting with the start vertices.
+    """
+
+    __slots__ = ["vertices", "edges", "levels"]
+
+    def __init__(self, vertices, edges, levels):
+        self.vertices = vertices
+        self.edges = edges
+        self.levels = levels
+
+def neighborhood(client, start, hops, direction=EdgeDirection.OUTBOUND, t=None, max_fanout=None,
+                 batch_size=1000, max_in_flight=8):
+    """
+    Returns the `Neighborhood` within `hops` edges of `start`, which is a
+    vertex ID or an iterable of them.
+
+    `direction` is the `EdgeDirection` to follow, or `None` to follow edges
+    both ways. `t` restricts the traversal to edges of a type, or of any of
+    several types. `max_fanout` caps the number of new vertices added at
+    each level; edges to the vertices left out are not included.
+    """
+    if hops < 0:
+        raise ValueError("hops cannot be negative")
+    if max_fanout is not None and max_fanout < 1:
+        raise ValueError("max_fanout must be at least 1")
+
+    starts = [start] if isinstance(start, uuid.UUID) else list(start)
+    frontier = list(dict.fromkeys(id.bytes for id in starts))
+    visited = set(frontier)
+    types = {}
+    edges = {}
+    levels = [frontier]
+
+    if hops == 0 and frontier:
+        query = SpecificVertexQuery(*(uuid.UUID(bytes=id) for id in frontier))
+        for chunk in client.get(query, lazy=True):
+            for view in chunk:
+                types[view.to_message().id.value] = view.to_message().t.value
+
+    for depth in range(hops):
+        if not frontier:
+            break
+
+        # the start vertices are fetched along with the first level
+        expansion = _expand(client, frontier, direction, t, batch_size, max_in_flight, include=depth == 0)
+        next_frontier = []
+        for edge_direction, view in expansion:
+            message = view.to_message()
+            if isinstance(view, VertexView):
+                types[message.id.value] = message.t.value
+                continue
+
+            key = (message.outbound_id.value, message.t.value, message.inbound_id.value)
+            if key in edges:
+                continue
+            neighbor = key[2] if edge_direction == EdgeDirection.OUTBOUND else key[0]
+            if neighbor not in visited:
+                if max_fanout is not None and len(next_frontier) >= max_fanout:
+                    continue
+                visited.add(neighbor)
+                next_frontier.append(neighbor)
+            edges[key] = view
+
+        frontier = next_frontier
+        levels.append(frontier)
+
+    return Neighborhood(
+        vertices=[Vertex(uuid.UUID(bytes=id), types[id]) for level in levels for id in level if id in types],
+        edges=[edge.to_model() for edge in edges.values()],
+        levels=[[uuid.UUID(bytes=id) for id in level] for level in levels if level],
+    )
+
+def shortest_path(client, source, target, direction=EdgeDirection.OUTBOUND, t=None, max_depth=None,
+                  timeout=None, batch_size=1000, max_in_flight=8):
+    """
+    Finds a shortest path from `source` to `target` with a bidirectional
+    breadth-first search, expanding whichever side has the smaller frontier
+    one level per round trip. Returns the path as a list of `Edge`s, or
+    `None` if there is no path of at most `max_depth` edges.
+
+    `direction` is the `EdgeDirection` the path follows, or `None` to follow
+    edges either way, and `t` restricts the path to edges of a type, or of
+    any of several types. If the search takes longer than `timeout`
+    seconds, `TimeoutError` is raised; the queries of the level being
+    expanded are given the remaining time as their deadline, so the search
+    stops about when its time runs out.
+    """
+    if max_depth is not None and max_depth < 0:
+        raise ValueError("max_depth cannot be negative")
+    if source == target:
+        return []
+
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    backward_direction = {
+        EdgeDirection.OUTBOUND: EdgeDirection.INBOUND,
+        EdgeDirection.INBOUND: EdgeDirection.OUTBOUND,
+        None: None,
+    }[direction]
+
+    forward = _SearchSide(source.bytes, direction)
+    backward = _SearchSide(target.bytes, backward_direction)
+
+    while forward.frontier and backward.frontier:
+        if max_depth is not None and forward.depth + backward.depth >= max_depth:
+            return None
+        if deadline is not None and time.monotonic() >= deadline:
+            raise TimeoutError("shortest path search timed out")
+
+        side, other = (forward, backward) if len(forward.frontier) <= len(backward.frontier) else (backward, forward)
+        remaining = deadline - time.monotonic() if deadline is not None else None
+        try:
+            meetings = side.expand(client, t, batch_size, max_in_flight, other, remaining)
+        except grpc.RpcError as e:
+            if e.code() == grpc.StatusCode.DEADLINE_EXCEEDED:
+                raise TimeoutError("shortest path search timed out") from e
+            raise
+        if meetings:
+            meeting = min(meetings, key=lambda id: other.depths[id])
+            return [edge.to_model() for edge in forward.path(meeting)[::-1] + backward.path(meeting)]
+
+    return None
+
+class _SearchSide:
+    """
+    One side of a bidirectional search, which remembers the edge each
+    vertex was first reached through.
+    """
+
+    def __init__(self, start, direction):
+        self.direction = direction
+        self.frontier = [start]
+        self.depth = 0
+        self.depths = {start: 0}
+        self.parents = {start: None}
+
+    def expand(self, client, t, batch_size, max_in_flight, other, timeout=None):
+        """
+        Expands the frontier by a level, which must take no longer than
+        `timeout` seconds, returning the newly reached vertices that the
+        other side has reached too.
+        """
+        next_frontier = []
+        meetings = []
+        expansion = _expand(client, self.frontier, self.direction, t, batch_size, max_in_flight, vertices=False,
+                            timeout=timeout)
+        for edge_direction, view in expansion:
+            message = view.to_message()
+            if edge_direction == EdgeDirection.OUTBOUND:
+                near, far = message.outbound_id.value, message.inbound_id.value
+            else:
+                near, far = message.inbound_id.value, message.outbound_id.value
+            if far in self.parents:
+                continue
+            self.parents[far] = (view, near)
+            self.depths[far] = self.depth + 1
+            next_frontier.append(far)
+            if far in other.parents:
+                meetings.append(far)
+
+        self.frontier = next_frontier
+        self.depth += 1
+        return meetings
+
+    def path(self, id):
+        """Returns the edges from `id` back to this side's start."""
+        edges = []
+        while self.parents[id] is not None:
+            edge, id = self.parents[id]
+            edges.append(edge)
+        return edges
+
+def random_walks(client, starts, length, walks_per_start=1, direction=EdgeDirection.OUTBOUND, t=None,
+                 restart=0.0, walkers=10000, seed=None, batch_size=1000, max_in_flight=8):
+    """
+    Lazily yields random walks of `length` steps, as lists of vertex IDs,
+    starting `walks_per_start` times from each ID in `starts`.
+
+    Up to `walkers` walks advance together, and each step fetches the edges
+    of all of their current vertices in one batch of concurrent queries. At
+    each step, a walk jumps back to its start with probability `restart`,
+    and otherwise follows a random edge (in `direction`, or either way if
+    it is `None`, and of type `t`, if given). Walks that reach a vertex with
+    no such edges end early. Walks are yielded as they finish, so not in
+    the order of `starts`.
+    """
+    if length < 0:
+        raise ValueError("length cannot be negative")
+    if not 0 <= restart < 1:
+        raise ValueError("restart must be in [0, 1)")
+    if walkers < 1:
+        raise ValueError("walkers must be at least 1")
+
+    rng = random.Random(seed)
+    pending = (id.bytes for id in starts for _ in range(walks_per_start))
+    active = []
+
+    while True:
+        for start in itertools.islice(pending, walkers - len(active)):
+            active.append([start])
+
+        still_active = []
+        for walk in active:
+            if len(walk) > length:
+                yield [uuid.UUID(bytes=id) for id in walk]
+            else:
+                still_active.append(walk)
+        active = still_active
+        if not active:
+            return
+
+        moving = []
+        for walk in active:
+            if len(walk) > 1 and restart and rng.random() < restart:
+                walk.append(walk[0])
+            else:
+                moving.append(walk)
+
+        neighbors = {}
+        frontier = list(dict.fromkeys(walk[-1] for walk in moving))
+        for edge_direction, view in _expand(client, frontier, direction, t, batch_size, max_in_flight,
+                                            vertices=False):
+            message = view.to_message()
+            if edge_direction == EdgeDirection.OUTBOUND:
+                neighbors.setdefault(message.outbound_id.value, []).append(message.inbound_id.value)
+            else:
+                neighbors.setdefault(message.inbound_id.value, []).append(message.outbound_id.value)
+
+        for walk in moving:
+            choices = neighbors.get(walk[-1])
+            if choices:
+                walk.append(rng.choice(choices))
+            else:
+                # a dead end, so the walk is over
+                walk.append(None)
+        still_active = []
+        for walk in active:
+            if walk[-1] is None:
+                walk.pop()
+                yield [uuid.UUID(bytes=id) for id in walk]
+            else:
+                still_active.append(walk)
+        active = still_active
+
+def write_walks(walks, file):
+    """Writes walks to a text file, one per line, as space-separated IDs."""
+    count = 0
+    for walk in walks:
+        file.write(" ".join(str(id) for id in walk))
+        file.write("\n")
+        count += 1
+    return count
+
+def _directions(direction):
+    if direction is None:
+        return (EdgeDirection.OUTBOUND, EdgeDirection.INBOUND)
+    return (direction,)
+
+def _types(t):
+    if t is None or isinstance(t, str):
+        return (t,)
+    return tuple(t)
+
+def _expand(client, frontier, direction, t, batch_size, max_in_flight, include=False, vertices=True,
+            timeout=None):
+    """
+    Fetches the edges adjacent to the `frontier` (a list of raw vertex IDs),
+    along with the vertices at their other ends unless `vertices` is unset,
+    in one batch of concurrent queries. Yields `(direction, view)` pairs,
+    where `view` is an `EdgeView`, or a `VertexView` for the vertices (which,
+    if `include` is set, also covers the frontier itself). The queries fail
+    if they take longer than `timeout` seconds in all.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+
+    queries = []
+    directions = []
+    for i in range(0, len(frontier), batch_size):
+        query = SpecificVertexQuery(*(uuid.UUID(bytes=id) for id in frontier[i:i + batch_size]))
+        if include:
+            query = query.include()
+        for edge_direction in _directions(direction):
+            for edge_type in _types(t):
+                if edge_direction == EdgeDirection.OUTBOUND:
+                    edges = query.outbound()
+                else:
+                    edges = query.inbound()
+                if edge_type is not None:
+                    edges = edges.t(edge_type)
+                # the vertex at the other end of each edge
+                if not vertices:
+                    queries.append(edges)
+                elif edge_direction == EdgeDirection.OUTBOUND:
+                    queries.append(edges.include().inbound())
+                else:
+                    queries.append(edges.include().outbound())
+                directions.append(edge_direction)
+
+    results = client.get_many(queries, max_in_flight=max_in_flight, lazy=True, timeout=timeout)
+    for edge_direction, chunks in zip(directions, results):
+        for chunk in chunks:
+            for view in chunk:
+                yield edge_direction, view
@@ -10,7 +10,13 @@ setup(
     ],
 
     install_requires = [
-        "grpcio>=1.26.0",
+        "grpcio>=1.32.0",
         "protobuf>=3.11.2",
-    ]
+    ],
+
+    extras_require = {
+        "numpy": ["numpy"],
+        "arrow": ["pyarrow"],
+        "orjson": ["orjson"],
+    }
 )
@@ -0,0 +1,51 @@
+import os
+import uuid
+import unittest
+
+from indradb import *
+
+class WriteBatcherTestCase(unittest.TestCase):
+    def setUp(self):
+        self.client = Client(os.environ["INDRADB_HOST"])
+
+    def test_batched_writes(self):
+        vertices = [Vertex(uuid.uuid4(), "foo") for _ in range(10)]
+        edge = Edge(vertices[0].id, "bar", vertices[1].id)
+
+        with WriteBatcher(self.client, max_items=4, max_delay=1) as batcher:
+            futures = [batcher.create_vertex(v) for v in vertices]
+            futures.append(batcher.create_edge(edge))
+            futures.append(batcher.set_properties(SpecificVertexQuery(vertices[0].id), "baz", 1))
+            futures.append(batcher.set_properties(SpecificEdgeQuery(edge), "baz", 2))
+            # not batchable, so sent as its own call after the batched writes
+            futures.append(batcher.set_properties(SpecificVertexQuery(vertices[0].id).outbound(), "baz", 3))
+            batcher.flush()
+            self.assertTrue(all(f.done() for f in futures))
+
+        ids = [v.id for v in vertices]
+        self.assertEqual(list(self.client.get(SpecificVertexQuery(*ids))), [vertices])
+        self.assertEqual(list(self.client.get(SpecificEdgeQuery(edge))), [[edge]])
+        self.assertEqual(
+            list(self.client.get(SpecificVertexQuery(vertices[0].id).properties())),
+            [[VertexProperties(vertices[0], [NamedProperty("baz", 1)])]],
+        )
+        self.assertEqual(
+            list(self.client.get(SpecificEdgeQuery(edge).properties())),
+            [[EdgeProperties(edge, [NamedProperty("baz", 3)])]],
+        )
+
+    def test_max_delay(self):
+        vertex = Vertex(uuid.uuid4(), "foo")
+        with WriteBatcher(self.client, max_delay=0.01) as batcher:
+            self.assertIsNone(batcher.create_vertex(vertex).result(timeout=5))
+            self.assertEqual(list(self.client.get(SpecificVertexQuery(vertex.id))), [[vertex]])
+
+    def test_closed(self):
+        batcher = WriteBatcher(self.client)
+        batcher.close()
+        with self.assertRaises(RuntimeError):
+            batcher.create_vertex(Vertex(uuid.uuid4(), "foo"))
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            WriteBatcher(self.client, max_items=0)
@@ -0,0 +1,149 @@
+import time
+import threading
+import unittest
+
+from indradb import ResultCache, proto
+from indradb.cache import _SingleFlight
+
+def _chunk(count):
+    return proto.QueryOutputValue(count=count)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class ResultCacheTestCase(unittest.TestCase):
+    def test_get_put(self):
+        cache = ResultCache()
+        self.assertIsNone(cache.get(b"a"))
+        cache.put(b"a", [_chunk(1)])
+        self.assertEqual(cache.get(b"a"), [_chunk(1)])
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_max_entries(self):
+        cache = ResultCache(max_entries=2)
+        cache.put(b"a", [_chunk(1)])
+        cache.put(b"b", [_chunk(2)])
+        cache.get(b"a")
+        cache.put(b"c", [_chunk(3)])
+        self.assertIsNone(cache.get(b"b"))
+        self.assertEqual(cache.get(b"a"), [_chunk(1)])
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_max_bytes(self):
+        size = _chunk(1).ByteSize()
+        cache = ResultCache(max_bytes=2 * size)
+        cache.put(b"a", [_chunk(1)])
+        cache.put(b"b", [_chunk(1)])
+        cache.put(b"c", [_chunk(1)])
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats()["bytes"], 2 * size)
+        # entries larger than the whole cache are never stored
+        cache.put(b"d", [_chunk(1)] * 3)
+        self.assertIsNone(cache.get(b"d"))
+
+    def test_ttl(self):
+        clock = FakeClock()
+        cache = ResultCache(ttl=10, clock=clock)
+        cache.put(b"a", [_chunk(1)])
+        clock.now = 9
+        self.assertIsNotNone(cache.get(b"a"))
+        clock.now = 10
+        self.assertIsNone(cache.get(b"a"))
+        self.assertEqual(cache.stats()["expirations"], 1)
+        self.assertEqual(len(cache), 0)
+
+    def test_invalidate(self):
+        cache = ResultCache()
+        generation = cache.generation
+        cache.put(b"a", [_chunk(1)])
+        cache.invalidate()
+        self.assertIsNone(cache.get(b"a"))
+        self.assertEqual(cache.stats()["bytes"], 0)
+        # results read before an invalidation are stale
+        cache.put(b"a", [_chunk(1)], generation)
+        self.assertIsNone(cache.get(b"a"))
+
+class SingleFlightTestCase(unittest.TestCase):
+    def test_shared_call(self):
+        flights = _SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def fetch():
+            calls.append(None)
+            started.set()
+            release.wait()
+            return [_chunk(1)]
+
+        def caller():
+            results.append(flights.do(b"a", fetch))
+
+        threads = [threading.Thread(target=caller) for _ in range(8)]
+        threads[0].start()
+        started.wait()
+        for thread in threads[1:]:
+            thread.start()
+        # give the followers time to join the call
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [[_chunk(1)]] * 8)
+        # finished calls are not reused
+        flights.do(b"a", fetch)
+        self.assertEqual(len(calls), 2)
+
+    def test_shared_error(self):
+        flights = _SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        errors = []
+
+        def fetch():
+            started.set()
+            release.wait()
+            raise RuntimeError("boom")
+
+        def caller():
+            try:
+                flights.do(b"a", fetch)
+            except RuntimeError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=caller) for _ in range(3)]
+        threads[0].start()
+        started.wait()
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(errors), 3)
+
+    def test_forget(self):
+        flights = _SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow():
+            started.set()
+            release.wait()
+            return "old"
+
+        thread = threading.Thread(target=flights.do, args=(b"a", slow))
+        thread.start()
+        started.wait()
+        flights.forget()
+        self.assertEqual(flights.do(b"a", lambda: "new"), "new")
+        release.set()
+        thread.join()
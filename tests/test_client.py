@@ -1,6 +1,8 @@
 import os
+import time
 import uuid
 import unittest
+import threading
 
 from indradb import *
 
@@ -62,6 +64,82 @@ class ClientTestCase(unittest.TestCase):
         count = list(self.client.get(SpecificVertexQuery(outbound_id).outbound()))
         self.assertEqual(count, [[edge]])
 
+    def test_get_lazy(self):
+        outbound_id = self.client.create_vertex_from_type("foo")
+        inbound_id = self.client.create_vertex_from_type("foo")
+        edge = Edge(outbound_id, "bar", inbound_id)
+        self.client.create_edge(edge)
+        self.client.set_properties(SpecificEdgeQuery(edge), "foo", 42)
+
+        results = list(self.client.get(SpecificVertexQuery(outbound_id).outbound(), lazy=True))
+        self.assertEqual(results, [[edge]])
+        self.assertIsInstance(results[0][0], EdgeView)
+
+        results = list(self.client.get(SpecificEdgeQuery(edge).properties(), lazy=True))
+        self.assertEqual(results, [[EdgeProperties(edge, [NamedProperty("foo", 42)])]])
+
+    def test_stream(self):
+        t = "stream{}".format(uuid.uuid4().hex)
+        ids = [self.client.create_vertex_from_type(t) for _ in range(5)]
+        query = SpecificVertexQuery(*ids)
+
+        with self.client.stream(query) as results:
+            self.assertEqual(sorted(v.id for v in results), sorted(ids))
+        self.assertEqual(list(self.client.stream(query.properties().count())), [0])
+        self.assertIsInstance(next(self.client.stream(query, lazy=True)), VertexView)
+
+        results = self.client.stream(query)
+        self.assertEqual(len(results.take(2)), 2)
+        self.assertEqual(list(results), [])
+
+    def test_get_early_close(self):
+        ids = [self.client.create_vertex_from_type("foo") for _ in range(3)]
+        results = self.client.get(SpecificVertexQuery(*ids))
+        self.assertEqual(len(next(results)), 3)
+        results.close()
+        self.client.ping()
+
+    def test_vertices_exist(self):
+        ids = [self.client.create_vertex_from_type("foo") for _ in range(3)]
+        candidates = [ids[0], uuid.uuid4(), ids[1], uuid.uuid4(), ids[2]]
+        expected = [True, False, True, False, True]
+        self.assertEqual(self.client.vertices_exist(candidates, batch_size=2).tolist(), expected)
+        self.assertEqual(self.client.vertices_exist([]).tolist(), [])
+
+    def test_edges_exist(self):
+        a, b = self.client.create_vertex_from_type("foo"), self.client.create_vertex_from_type("foo")
+        self.client.create_edge(Edge(a, "bar", b))
+        candidates = [Edge(a, "bar", b), (a, "baz", b), (a, "bar", b), Edge(b, "bar", a)]
+        self.assertEqual(self.client.edges_exist(candidates, batch_size=3).tolist(), [True, False, True, False])
+        self.assertEqual(self.client.edges_exist([]).tolist(), [])
+
+    def test_prepared_query(self):
+        prepared = self.client.prepare(SpecificVertexQuery(Param("id")).outbound().t(Param("t")))
+        for t in ("bar", "baz"):
+            outbound_id = self.client.create_vertex_from_type("foo")
+            inbound_id = self.client.create_vertex_from_type("foo")
+            edge = Edge(outbound_id, t, inbound_id)
+            self.client.create_edge(edge)
+            results = list(self.client.get(prepared.bind(id=outbound_id, t=t)))
+            self.assertEqual(results, [[edge]])
+            self.client.delete(prepared.bind(id=outbound_id, t=t))
+            results = list(self.client.get(prepared.bind(id=outbound_id, t=t)))
+            self.assertEqual(results, [[]])
+
+    def test_get_columns(self):
+        outbound_id = self.client.create_vertex_from_type("foo")
+        inbound_id = self.client.create_vertex_from_type("foo")
+        self.client.create_edge(Edge(outbound_id, "bar", inbound_id))
+
+        [columns] = list(self.client.get_columns(SpecificVertexQuery(outbound_id).outbound()))
+        self.assertEqual(columns["outbound_id"].tobytes(), outbound_id.bytes)
+        self.assertEqual(list(columns["t"]), ["bar"])
+        self.assertEqual(columns["inbound_id"].tobytes(), inbound_id.bytes)
+
+        [batch] = list(self.client.get_columns(SpecificVertexQuery(outbound_id, inbound_id), format="arrow"))
+        self.assertEqual(batch.column("id").to_pylist(), [outbound_id.bytes, inbound_id.bytes])
+        self.assertEqual(batch.column("t").to_pylist(), ["foo", "foo"])
+
     def test_vertex_properties(self):
         id = self.client.create_vertex_from_type("foo")
         query = SpecificVertexQuery(id)
@@ -93,6 +171,17 @@ class ClientTestCase(unittest.TestCase):
         self.assertEqual(m2, [[EdgeProperties(edge, [NamedProperty("foo", 42)])]])
         self.assertEqual(m3, [[]])
 
+    def test_property_codecs(self):
+        for codec in (JsonCodec(), OrjsonCodec()):
+            client = Client(os.environ["INDRADB_HOST"], codec=codec)
+            id = client.create_vertex_from_type("foo")
+            query = SpecificVertexQuery(id)
+            value = {"codec": type(codec).__name__, "values": [1, 2.5, None]}
+            client.set_properties(query, "foo", value)
+
+            results = list(client.get(query.with_property_equal_to("foo", value).properties()))
+            self.assertEqual(results, [[VertexProperties(Vertex(id, "foo"), [NamedProperty("foo", value)])]])
+
     def test_get_all_vertex_properties(self):
         id = self.client.create_vertex_from_type("foo")
         query = SpecificVertexQuery(id)
@@ -124,6 +213,254 @@ class ClientTestCase(unittest.TestCase):
         self.assertEqual(m2, [[EdgeProperties(edge, [NamedProperty("foo", 42)])]])
         self.assertEqual(m3, [[]])
 
+class FutureClientTestCase(unittest.TestCase):
+    def setUp(self):
+        self.client = Client(os.environ["INDRADB_HOST"], max_workers=4)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_write_futures(self):
+        ids = [f.result() for f in [self.client.create_vertex_from_type_future("foo") for _ in range(3)]]
+        vertex = Vertex(uuid.uuid4(), "foo")
+        self.assertTrue(self.client.create_vertex_future(vertex).result())
+        edge = Edge(ids[0], "bar", vertex.id)
+        self.assertTrue(self.client.create_edge_future(edge).result())
+        self.assertIsNone(self.client.set_properties_future(SpecificEdgeQuery(edge), "baz", 1).result())
+        self.assertEqual(
+            self.client.get_future(SpecificEdgeQuery(edge).properties()).result(),
+            [[EdgeProperties(edge, [NamedProperty("baz", 1)])]],
+        )
+        self.assertIsNone(self.client.delete_future(SpecificVertexQuery(*ids)).result())
+        self.assertEqual(self.client.get_future(SpecificVertexQuery(*ids)).result(), [[]])
+
+    def test_get_many(self):
+        ids = [self.client.create_vertex_from_type("foo") for _ in range(20)]
+        results = list(self.client.get_many((SpecificVertexQuery(id) for id in ids), max_in_flight=5))
+        self.assertEqual(results, [[[Vertex(id, "foo")]] for id in ids])
+        with self.assertRaises(ValueError):
+            list(self.client.get_many([], max_in_flight=0))
+
+    def test_future_error(self):
+        # nothing listens on port 1, so the call fails
+        with Client("localhost:1") as client:
+            with self.assertRaises(Exception):
+                client.create_vertex_from_type_future("foo").result()
+
+class PooledClientTestCase(unittest.TestCase):
+    def test_round_robin(self):
+        with Client(os.environ["INDRADB_HOST"], channels=3) as client:
+            for _ in range(6):
+                id = client.create_vertex_from_type("foo")
+                self.assertEqual(list(client.get(SpecificVertexQuery(id))), [[Vertex(id, "foo")]])
+
+    def test_least_outstanding(self):
+        with Client(os.environ["INDRADB_HOST"], channels=3, balancing=LEAST_OUTSTANDING) as client:
+            id = client.create_vertex_from_type("foo")
+            # hold a stream open so the next request picks another channel
+            pending = client.get(SpecificVertexQuery(id))
+            self.assertEqual(next(pending), [Vertex(id, "foo")])
+            self.assertEqual(list(client.get(SpecificVertexQuery(id))), [[Vertex(id, "foo")]])
+            self.assertEqual(list(pending), [])
+
+    def test_least_outstanding_blocking(self):
+        release = threading.Event()
+
+        def requests():
+            release.wait(10)
+            yield from ()
+
+        with Client(os.environ["INDRADB_HOST"], channels=3, balancing=LEAST_OUTSTANDING) as client:
+            counters = client._pool._counters
+            threads = []
+            for i in range(3):
+                thread = threading.Thread(target=lambda: client.stub.BulkInsert(requests()), daemon=True)
+                thread.start()
+                threads.append(thread)
+                deadline = time.monotonic() + 5
+                while sum(c.in_flight for c in counters) <= i and time.monotonic() < deadline:
+                    time.sleep(0.01)
+
+            # each blocking call still running holds its own channel
+            self.assertEqual([c.in_flight for c in counters], [1, 1, 1])
+            release.set()
+            for thread in threads:
+                thread.join(10)
+            self.assertEqual([c.in_flight for c in counters], [0, 0, 0])
+
+    def test_invalid_pool(self):
+        with self.assertRaises(ValueError):
+            Client(os.environ["INDRADB_HOST"], channels=0)
+        with self.assertRaises(ValueError):
+            Client(os.environ["INDRADB_HOST"], balancing="random")
+
+class SplitQueryClientTestCase(unittest.TestCase):
+    def setUp(self):
+        self.client = Client(os.environ["INDRADB_HOST"], max_query_ids=2)
+        self.ids = [self.client.create_vertex_from_type("foo") for _ in range(5)]
+        self.target = self.client.create_vertex_from_type("foo")
+        for id in self.ids:
+            self.client.create_edge(Edge(id, "bar", self.target))
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_split_get(self):
+        query = SpecificVertexQuery(*self.ids)
+        self.assertEqual([v.id for chunk in self.client.get(query) for v in chunk], self.ids)
+        self.assertEqual([v.id for v in self.client.stream(query)], self.ids)
+        self.assertEqual(sum(len(c["id"]) for c in self.client.get_columns(query)), 5)
+        self.assertEqual(list(self.client.get(query.outbound().count())), [5])
+
+    def test_split_matches_whole(self):
+        missing = SpecificVertexQuery(*(uuid.uuid4() for _ in range(5)))
+        queries = [
+            SpecificVertexQuery(*self.ids),
+            SpecificVertexQuery(*self.ids).outbound().include().inbound(),
+            SpecificVertexQuery(*self.ids).include().outbound().count(),
+            SpecificVertexQuery(*self.ids).properties(),
+            missing,
+            missing.include().outbound(),
+        ]
+        with Client(os.environ["INDRADB_HOST"], max_query_ids=None) as whole:
+            for query in queries:
+                self.assertEqual(list(self.client.get(query)), list(whole.get(query)))
+        self.assertEqual(list(self.client.get(missing)), [[]])
+
+    def test_split_streaming(self):
+        read = []
+        get_chunks = self.client._get_chunks
+
+        def counting_get_chunks(req, timeout=None):
+            for res_chunk in get_chunks(req, timeout):
+                read.append(res_chunk)
+                yield res_chunk
+
+        self.client._get_chunks = counting_get_chunks
+        # three parts, with two outputs each
+        results = self.client.get(SpecificVertexQuery(*self.ids).include().outbound())
+        self.assertEqual([v.id for v in next(results)], self.ids)
+        self.assertEqual(len(read), 3)
+        self.assertEqual(len(next(results)), 5)
+        self.assertEqual(len(read), 6)
+        results.close()
+
+    def test_split_get_many(self):
+        # the parts must not wait on workers busy running the queries
+        # they belong to
+        results = []
+        with Client(os.environ["INDRADB_HOST"], max_workers=2, max_query_ids=2) as client:
+            queries = [SpecificVertexQuery(*self.ids), SpecificVertexQuery(*self.ids[::-1])]
+            thread = threading.Thread(target=lambda: results.extend(client.get_many(queries, max_in_flight=2)),
+                                      daemon=True)
+            thread.start()
+            thread.join(10)
+            self.assertFalse(thread.is_alive())
+        self.assertEqual([[v.id for chunk in chunks for v in chunk] for chunks in results], [self.ids, self.ids[::-1]])
+
+    def test_split_writes(self):
+        query = SpecificVertexQuery(*self.ids)
+        self.client.set_properties(query, "baz", 1)
+        self.assertEqual(list(self.client.get(query.properties().count())), [5])
+        self.client.delete(query)
+        self.assertEqual([v for chunk in self.client.get(query) for v in chunk], [])
+        self.assertEqual(list(self.client.get(query.count())), [0])
+
+    def test_split_write_futures(self):
+        query = SpecificVertexQuery(*self.ids)
+        self.assertIsNone(self.client.set_properties_future(query, "baz", 1).result())
+        self.assertEqual(list(self.client.get(query.properties().count())), [5])
+        self.assertIsNone(self.client.delete_future(query).result())
+        self.assertEqual(list(self.client.get(query.count())), [0])
+
+class CachedClientTestCase(unittest.TestCase):
+    def setUp(self):
+        self.cache = ResultCache()
+        self.client = Client(os.environ["INDRADB_HOST"], cache=self.cache)
+
+    def test_cached_get(self):
+        id = self.client.create_vertex_from_type("foo")
+        query = SpecificVertexQuery(id)
+        self.assertEqual(list(self.client.get(query)), [[Vertex(id, "foo")]])
+        self.assertEqual(list(self.client.get(query)), [[Vertex(id, "foo")]])
+        self.assertEqual(list(self.client.get_columns(query))[0]["t"].tolist(), ["foo"])
+        self.assertEqual(self.cache.stats()["hits"], 2)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    def test_write_invalidation(self):
+        id = self.client.create_vertex_from_type("foo")
+        query = SpecificVertexQuery(id).properties()
+        self.assertEqual(list(self.client.get(query)), [[]])
+        self.client.set_properties(SpecificVertexQuery(id), "bar", 1)
+        self.assertEqual(list(self.client.get(query)), [[VertexProperties(Vertex(id, "foo"), [NamedProperty("bar", 1)])]])
+        self.client.delete(SpecificVertexQuery(id))
+        self.assertEqual(list(self.client.get(query)), [[]])
+        self.assertEqual(self.cache.stats()["hits"], 0)
+
+        inserter = BulkInserter()
+        inserter.vertex(Vertex(id, "foo"))
+        inserter.execute(self.client)
+        self.assertEqual(len(self.cache), 0)
+
+class CoalescingClientTestCase(unittest.TestCase):
+    def test_coalesced_get(self):
+        with Client(os.environ["INDRADB_HOST"], coalesce=True) as client:
+            id = client.create_vertex_from_type("foo")
+            query = SpecificVertexQuery(id)
+            results = []
+            threads = [threading.Thread(target=lambda: results.append(list(client.get(query)))) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(results, [[[Vertex(id, "foo")]]] * 8)
+
+            client.delete(query)
+            self.assertEqual(list(client.get(query)), [[]])
+
+class AsyncClientTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.client = AsyncClient(os.environ["INDRADB_HOST"])
+
+    async def asyncTearDown(self):
+        await self.client.close()
+
+    async def collect(self, query):
+        return [chunk async for chunk in self.client.get(query)]
+
+    async def test_create_vertex(self):
+        id = uuid.uuid4()
+        v1 = Vertex(id, "foo")
+        self.assertTrue(await self.client.create_vertex(v1))
+        v2 = await self.collect(SpecificVertexQuery(id))
+        self.assertEqual(v2, [[v1]])
+
+    async def test_get_edges(self):
+        outbound_id = await self.client.create_vertex_from_type("foo")
+        inbound_id = await self.client.create_vertex_from_type("foo")
+        edge = Edge(outbound_id, "bar", inbound_id)
+        await self.client.create_edge(edge)
+        results = await self.collect(SpecificVertexQuery(outbound_id).outbound())
+        self.assertEqual(results, [[edge]])
+
+    async def test_vertex_properties(self):
+        id = await self.client.create_vertex_from_type("foo")
+        query = SpecificVertexQuery(id)
+        await self.client.set_properties(query, "foo", 42)
+        results = await self.collect(query.properties().name("foo"))
+        self.assertEqual(results, [[VertexProperties(Vertex(id, "foo"), [NamedProperty("foo", 42)])]])
+        await self.client.delete(query)
+        results = await self.collect(query)
+        self.assertEqual(results, [[]])
+
+    async def test_bulk_insert(self):
+        v1 = Vertex(uuid.uuid1(), "foo")
+        v2 = Vertex(uuid.uuid1(), "foo")
+        edge = Edge(v1.id, "bar", v2.id)
+        await BulkInserter().vertex(v1).vertex(v2).edge(edge).execute_async(self.client)
+        results = await self.collect(SpecificEdgeQuery(edge))
+        self.assertEqual(results, [[edge]])
+
 class BulkInserterTestCase(unittest.TestCase):
     def test_bulk_insert(self):
         client = Client(os.environ["INDRADB_HOST"])
@@ -160,3 +497,91 @@ class BulkInserterTestCase(unittest.TestCase):
         query = SpecificEdgeQuery(edge).properties().name("bez")
         results = list(client.get(query))
         self.assertEqual(results, [[EdgeProperties(edge, [NamedProperty("bez", False)])]])
+
+    def test_streaming_bulk_insert(self):
+        client = Client(os.environ["INDRADB_HOST"])
+
+        vertices = [Vertex(uuid.uuid1(), "foo") for _ in range(10)]
+        edges = [Edge(a.id, "bar", b.id) for a, b in zip(vertices, vertices[1:])]
+
+        inserter = BulkInserter(max_items=3, max_bytes=256)
+        inserter.vertices(v for v in vertices)
+        inserter.edges(e for e in edges)
+        inserter.vertex_properties((v.id, "baz", i) for i, v in enumerate(vertices))
+        inserter.edge_properties((e, "bez", {"i": i}) for i, e in enumerate(edges))
+        inserter.execute(client)
+
+        results = list(client.get(SpecificVertexQuery(*(v.id for v in vertices))))
+        self.assertEqual(results, [vertices])
+        results = list(client.get(SpecificEdgeQuery(*edges)))
+        self.assertEqual(results, [edges])
+
+        query = SpecificVertexQuery(vertices[4].id).properties().name("baz")
+        results = list(client.get(query))
+        self.assertEqual(results, [[VertexProperties(vertices[4], [NamedProperty("baz", 4)])]])
+
+        query = SpecificEdgeQuery(edges[2]).properties().name("bez")
+        results = list(client.get(query))
+        self.assertEqual(results, [[EdgeProperties(edges[2], [NamedProperty("bez", {"i": 2})])]])
+
+    def test_parallel_bulk_insert(self):
+        client = Client(os.environ["INDRADB_HOST"], channels=2)
+
+        vertices = [Vertex(uuid.uuid1(), "foo") for _ in range(50)]
+        edges = [Edge(a.id, "bar", b.id) for a, b in zip(vertices, vertices[1:])]
+
+        inserter = BulkInserter()
+        inserter.vertices(vertices)
+        inserter.edges(edges)
+        inserter.edge_properties((e, "bez", True) for e in edges)
+        report = inserter.execute_parallel(client, shards=3, batch_size=7)
+
+        self.assertEqual(len(report.shards), 3)
+        self.assertEqual(report.total.items, len(vertices) + 2 * len(edges))
+        self.assertEqual(sum(s.items for s in report.shards), report.total.items)
+        self.assertGreater(report.total.items_per_second, 0)
+
+        results = list(client.get(SpecificVertexQuery(*(v.id for v in vertices))))
+        self.assertEqual(results, [vertices])
+        results = list(client.get(SpecificEdgeQuery(*edges).properties().name("bez")))
+        self.assertEqual(results, [[EdgeProperties(e, [NamedProperty("bez", True)]) for e in edges]])
+
+    def test_parallel_bulk_insert_order(self):
+        client = Client(os.environ["INDRADB_HOST"])
+
+        vertices = [Vertex(uuid.uuid1(), "foo") for _ in range(20)]
+        inserter = BulkInserter()
+        inserter.vertices(vertices)
+        # rewrites of the same vertices and properties, spread over batches
+        inserter.vertices(Vertex(v.id, "bar") for v in vertices)
+        for i in range(3):
+            inserter.vertex_properties((v.id, "baz", i) for v in vertices)
+        inserter.execute_parallel(client, shards=4, batch_size=3)
+
+        expected = [Vertex(v.id, "bar") for v in vertices]
+        self.assertEqual(list(client.get(SpecificVertexQuery(*(v.id for v in vertices)))), [expected])
+        query = SpecificVertexQuery(*(v.id for v in vertices)).properties().name("baz")
+        self.assertEqual(list(client.get(query)), [[VertexProperties(v, [NamedProperty("baz", 2)]) for v in expected]])
+
+    def test_columnar_bulk_insert(self):
+        import numpy as np
+        import pyarrow as pa
+
+        client = Client(os.environ["INDRADB_HOST"])
+
+        vertices = [Vertex(uuid.uuid1(), "foo") for _ in range(10)]
+        edges = [Edge(a.id, "bar", b.id) for a, b in zip(vertices, vertices[1:])]
+
+        ids = np.frombuffer(b"".join(v.id.bytes for v in vertices), dtype=np.uint8).reshape(-1, 16)
+        table = pa.table({
+            "outbound_id": pa.array([e.outbound_id.bytes for e in edges], type=pa.binary(16)),
+            "t": pa.array([e.t for e in edges]),
+            "inbound_id": pa.array([e.inbound_id.bytes for e in edges], type=pa.binary(16)),
+        })
+
+        BulkInserter().vertex_arrays(ids, "foo").edge_table(table).execute(client)
+
+        results = list(client.get(SpecificVertexQuery(*(v.id for v in vertices))))
+        self.assertEqual(results, [vertices])
+        results = list(client.get(SpecificEdgeQuery(*edges)))
+        self.assertEqual(results, [edges])
@@ -0,0 +1,30 @@
+import json
+import unittest
+
+from indradb import JsonCodec, OrjsonCodec
+from indradb.codec import default_codec
+
+class CodecTestCase(unittest.TestCase):
+    VALUES = [None, True, 42, -1.5, "foo", [1, "two", None], {"a": {"b": [1, 2]}}]
+
+    def test_round_trip(self):
+        for codec in (JsonCodec(), OrjsonCodec()):
+            for value in self.VALUES:
+                encoded = codec.dumps(value)
+                self.assertIsInstance(encoded, str)
+                self.assertEqual(json.loads(encoded), value)
+                self.assertEqual(codec.loads(encoded), value)
+                self.assertEqual(codec.loads(encoded.encode("utf-8")), value)
+
+    def test_non_string_keys(self):
+        self.assertEqual(json.loads(OrjsonCodec().dumps({1: "a"})), {"1": "a"})
+
+    def test_fallback(self):
+        codec = OrjsonCodec()
+        self.assertEqual(codec.loads(codec.dumps(2 ** 70)), 2 ** 70)
+        self.assertEqual(codec.loads(codec.dumps({1: 2 ** 70})), {"1": 2 ** 70})
+        self.assertEqual(codec.loads(JsonCodec().dumps(float("inf"))), float("inf"))
+
+    def test_default_codec(self):
+        self.assertIs(type(default_codec()), JsonCodec)
+        self.assertIs(default_codec(), default_codec())
@@ -0,0 +1,128 @@
+import uuid
+import unittest
+
+import numpy as np
+import pyarrow as pa
+
+from indradb import *
+from indradb import columnar
+
+def uuid_array(ids):
+    return np.frombuffer(b"".join(i.bytes for i in ids), dtype=np.uint8).reshape(-1, 16)
+
+class ColumnarIngestTestCase(unittest.TestCase):
+    def setUp(self):
+        self.ids = [uuid.uuid4() for _ in range(5)]
+        self.types = ["a", "b", "a", "c", "b"]
+
+    def test_vertex_items_numpy(self):
+        items = list(columnar.vertex_items(uuid_array(self.ids), np.array(self.types)))
+        expected = [proto.BulkInsertItem(vertex=Vertex(i, t).to_message()) for i, t in zip(self.ids, self.types)]
+        self.assertEqual(items, expected)
+
+    def test_vertex_items_single_type(self):
+        ids = uuid_array(self.ids).view("S16").reshape(-1)
+        items = list(columnar.vertex_items(ids, "foo"))
+        expected = [proto.BulkInsertItem(vertex=Vertex(i, "foo").to_message()) for i in self.ids]
+        self.assertEqual(items, expected)
+
+    def test_edge_items_arrow(self):
+        outbound = pa.array([i.bytes for i in self.ids], type=pa.binary(16))
+        inbound = pa.chunked_array([
+            pa.array([i.bytes for i in reversed(self.ids[2:])], type=pa.binary(16)),
+            pa.array([i.bytes for i in reversed(self.ids[:2])], type=pa.binary(16)),
+        ])
+        types = pa.array(self.types).dictionary_encode()
+        table = pa.table({"outbound_id": outbound, "t": types, "inbound_id": inbound})
+
+        items = list(columnar.edge_items(table.column("outbound_id"), table.column("t"), table.column("inbound_id")))
+        expected = [
+            proto.BulkInsertItem(edge=Edge(o, t, i).to_message())
+            for o, t, i in zip(self.ids, self.types, reversed(self.ids))
+        ]
+        self.assertEqual(items, expected)
+
+    def test_sliced_arrow_array(self):
+        ids = pa.array([i.bytes for i in self.ids], type=pa.binary(16)).slice(2)
+        items = list(columnar.vertex_items(ids, pa.array(self.types).slice(2)))
+        expected = [proto.BulkInsertItem(vertex=Vertex(i, t).to_message()) for i, t in zip(self.ids[2:], self.types[2:])]
+        self.assertEqual(items, expected)
+
+    def test_mismatched_lengths(self):
+        with self.assertRaises(ValueError):
+            columnar.vertex_items(uuid_array(self.ids), self.types[:2])
+        with self.assertRaises(ValueError):
+            columnar.edge_items(uuid_array(self.ids), "foo", uuid_array(self.ids[:2]))
+        with self.assertRaises(ValueError):
+            columnar.vertex_items(b"\x00" * 17, "foo")
+
+class ColumnarQueryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.ids = [uuid.uuid4() for _ in range(5)]
+
+    def test_uuid_array(self):
+        expected = uuid_array(self.ids)
+        np.testing.assert_array_equal(columnar.uuid_array(self.ids), expected)
+        np.testing.assert_array_equal(columnar.uuid_array(expected), expected)
+        arrow = pa.array([i.bytes for i in self.ids], type=pa.binary(16))
+        np.testing.assert_array_equal(columnar.uuid_array(arrow), expected)
+        self.assertEqual(columnar.uuid_array([]).shape, (0, 16))
+
+    def test_specific_vertex_query(self):
+        self.assertEqual(columnar.specific_vertex_query(self.ids), SpecificVertexQuery(*self.ids).to_bytes())
+        self.assertEqual(columnar.specific_vertex_query(uuid_array(self.ids)), SpecificVertexQuery(*self.ids).to_bytes())
+        self.assertEqual(columnar.specific_vertex_query([]), SpecificVertexQuery().to_bytes())
+
+class ColumnarResultsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.ids = [uuid.uuid4() for _ in range(3)]
+        self.edges = [Edge(self.ids[0], "a", self.ids[1]), Edge(self.ids[1], "b", self.ids[2]), Edge(self.ids[2], "a", self.ids[0])]
+
+    def test_count(self):
+        self.assertEqual(columnar.decode_chunk(proto.QueryOutputValue(count=3)), 3)
+
+    def test_vertices_numpy(self):
+        message = proto.QueryOutputValue(vertices=proto.QueryOutputVertices(vertices=[
+            Vertex(self.ids[0], "foo").to_message(),
+            Vertex(self.ids[1], "bar").to_message(),
+        ]))
+        columns = columnar.decode_chunk(message)
+        self.assertEqual(list(columns), ["id", "t"])
+        self.assertEqual(columns["id"].shape, (2, 16))
+        self.assertEqual(columns["id"][1].tobytes(), self.ids[1].bytes)
+        self.assertEqual(list(columns["t"]), ["foo", "bar"])
+
+    def test_edges_arrow(self):
+        message = proto.QueryOutputValue(edges=proto.QueryOutputEdges(edges=[e.to_message() for e in self.edges]))
+        batch = columnar.decode_chunk(message, columnar.ARROW)
+        self.assertEqual(batch.schema.names, ["outbound_id", "t", "inbound_id"])
+        self.assertEqual(batch.column("outbound_id").to_pylist(), [e.outbound_id.bytes for e in self.edges])
+        self.assertEqual(batch.column("inbound_id").to_pylist(), [e.inbound_id.bytes for e in self.edges])
+        self.assertEqual(batch.column("t").to_pylist(), ["a", "b", "a"])
+        self.assertEqual(batch.column("t").dictionary.to_pylist(), ["a", "b"])
+
+    def test_edge_properties(self):
+        message = proto.QueryOutputValue(edge_properties=proto.QueryOutputEdgeProperties(edge_properties=[
+            proto.EdgeProperties(edge=self.edges[0].to_message(), props=[
+                proto.NamedProperty(name=proto.Identifier(value="x"), value=proto.Json(value="1")),
+                proto.NamedProperty(name=proto.Identifier(value="y"), value=proto.Json(value="[2]")),
+            ]),
+        ]))
+        columns = columnar.decode_chunk(message)
+        self.assertEqual(list(columns), ["outbound_id", "t", "inbound_id", "name", "value"])
+        self.assertEqual(len(columns["outbound_id"]), 2)
+        self.assertEqual(list(columns["name"]), ["x", "y"])
+        self.assertEqual(list(columns["value"]), ["1", "[2]"])
+
+        batch = columnar.decode_chunk(message, columnar.ARROW)
+        self.assertEqual(batch.num_rows, 2)
+        self.assertEqual(batch.column("value").to_pylist(), ["1", "[2]"])
+
+    def test_empty(self):
+        message = proto.QueryOutputValue(vertices=proto.QueryOutputVertices())
+        self.assertEqual(columnar.decode_chunk(message)["id"].shape, (0, 16))
+        self.assertEqual(columnar.decode_chunk(message, columnar.ARROW).num_rows, 0)
+
+    def test_no_value(self):
+        with self.assertRaises(ValueError):
+            columnar.decode_chunk(proto.QueryOutputValue())
@@ -0,0 +1,91 @@
+import os
+import uuid
+import unittest
+
+import numpy as np
+
+from indradb import *
+
+def _column(ids):
+    return np.frombuffer(b"".join(id.bytes for id in ids), dtype=np.uint8).reshape(-1, 16)
+
+class CSRGraphTestCase(unittest.TestCase):
+    def setUp(self):
+        # 0 -> 1 -> 2 -> 0 is a cycle, 3 -> 4 hangs off it, and 5 is isolated
+        self.ids = [uuid.UUID(int=i) for i in range(6)]
+        ids = self.ids
+        self.graph = CSRGraph.from_arrays(
+            _column([ids[2], ids[0], ids[1], ids[3]]),
+            _column([ids[0], ids[1], ids[2], ids[4]]),
+            np.array(["bar", "foo", "bar", "baz"], dtype=object),
+            vertex_ids=_column([ids[5]]),
+        )
+
+    def test_structure(self):
+        graph = self.graph
+        self.assertEqual(graph.num_vertices, 6)
+        self.assertEqual(graph.num_edges, 4)
+        self.assertEqual(graph.offsets.tolist(), [0, 1, 2, 3, 4, 4, 4])
+        self.assertEqual(graph.targets.tolist(), [1, 2, 0, 4])
+        self.assertEqual([graph.types[c] for c in graph.edge_types], ["foo", "bar", "bar", "baz"])
+        self.assertEqual(graph.neighbors(3).tolist(), [4])
+        self.assertEqual(graph.id(4), self.ids[4])
+        self.assertEqual(graph.index(self.ids[4]), 4)
+        self.assertEqual(graph.index(uuid.uuid4()), -1)
+
+    def test_degrees(self):
+        self.assertEqual(self.graph.out_degree().tolist(), [1, 1, 1, 1, 0, 0])
+        self.assertEqual(self.graph.in_degree().tolist(), [1, 1, 1, 0, 1, 0])
+        self.assertEqual(self.graph.degree().tolist(), [2, 2, 2, 1, 1, 0])
+
+    def test_pagerank(self):
+        ranks = self.graph.pagerank(tol=1e-12)
+        self.assertAlmostEqual(ranks.sum(), 1.0)
+        self.assertAlmostEqual(ranks[0], ranks[1])
+        self.assertGreater(ranks[4], ranks[3])
+        self.assertAlmostEqual(ranks[3], ranks[5])
+
+    def test_connected_components(self):
+        self.assertEqual(self.graph.connected_components().tolist(), [0, 0, 0, 3, 3, 5])
+
+    def test_invalid_arrays(self):
+        with self.assertRaises(ValueError):
+            CSRGraph.from_arrays(_column(self.ids[:2]), _column(self.ids[:1]), ["foo", "foo"])
+
+class SnapshotTestCase(unittest.TestCase):
+    def test_snapshot(self):
+        client = Client(os.environ["INDRADB_HOST"])
+        vertices = [Vertex(uuid.uuid4(), "foo") for _ in range(3)]
+        for vertex in vertices:
+            client.create_vertex(vertex)
+        client.create_edge(Edge(vertices[0].id, "bar", vertices[1].id))
+
+        query = SpecificVertexQuery(*(v.id for v in vertices)).include().outbound()
+        graph = snapshot(client, query)
+        self.assertEqual(graph.num_vertices, 3)
+        self.assertEqual(graph.num_edges, 1)
+        source, target = graph.index(vertices[0].id), graph.index(vertices[1].id)
+        self.assertEqual(graph.neighbors(source).tolist(), [target])
+        self.assertEqual(graph.types, ["bar"])
+
+        with self.assertRaises(ValueError):
+            snapshot(client, AllEdgeQuery().count())
+        client.close()
+
+class DegreesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.client = Client(os.environ["INDRADB_HOST"])
+        self.ids = [self.client.create_vertex_from_type("foo") for _ in range(3)]
+        a, b, c = self.ids
+        for edge in [Edge(a, "bar", b), Edge(a, "baz", c), Edge(b, "bar", c)]:
+            self.client.create_edge(edge)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_degrees(self):
+        self.assertEqual(degrees(self.client, self.ids).tolist(), [2, 1, 0])
+        self.assertEqual(degrees(self.client, self.ids, direction=EdgeDirection.INBOUND).tolist(), [0, 1, 2])
+        self.assertEqual(degrees(self.client, self.ids, direction=None, max_in_flight=1).tolist(), [2, 2, 2])
+        self.assertEqual(degrees(self.client, _column(self.ids), t="bar").tolist(), [1, 1, 0])
+        self.assertEqual(degrees(self.client, []).tolist(), [])
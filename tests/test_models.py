@@ -113,11 +113,122 @@ class QueryTestCase(unittest.TestCase):
         self.assertEqual(message.pipe.direction, EdgeDirection.INBOUND.value)
         self.assertEqual(message.pipe.limit, 2 ** 32 - 1)
 
+    def test_vertex_with_property_value(self):
+        message = VertexWithPropertyValueQuery("foo", {"bar": [1, 2]}).to_message()
+        self.assertEqual(message.vertex_with_property_value.name.value, "foo")
+        self.assertEqual(json.loads(message.vertex_with_property_value.value.value), {"bar": [1, 2]})
+
+    def test_pipe_with_property_value(self):
+        query = SpecificVertexQuery(uuid.uuid1()).outbound().with_property_equal_to("foo", 3)
+        message = query.to_message(JsonCodec())
+        self.assertEqual(message.pipe_with_property_value.value.value, "3")
+        self.assertTrue(message.pipe_with_property_value.equal)
+        self.assertIsNotNone(message.pipe_with_property_value.inner.pipe)
+
+    def test_builders_return_new_queries(self):
+        id = uuid.uuid1()
+        base = SpecificVertexQuery(id).outbound()
+        limited = base.limit(5).t("foo")
+        self.assertEqual(base.to_message().pipe.limit, 2 ** 32 - 1)
+        self.assertFalse(base.to_message().pipe.HasField("t"))
+        self.assertEqual(limited.to_message().pipe.limit, 5)
+        self.assertEqual(limited.to_message().pipe.t.value, "foo")
+
+        query = RangeVertexQuery()
+        self.assertIsNot(query.start_id(id), query)
+        self.assertEqual(query.to_message().range_vertex.start_id.value, b"")
+
+    def test_immutable(self):
+        query = SpecificVertexQuery(uuid.uuid1()).outbound()
+        with self.assertRaises(AttributeError):
+            query._limit = 5
+
+    def test_count(self):
+        id = uuid.uuid1()
+        queries = [
+            RangeVertexQuery(),
+            SpecificVertexQuery(id),
+            SpecificVertexQuery(id).outbound().t("foo"),
+            SpecificVertexQuery(id).outbound().inbound().with_property("bar"),
+            SpecificEdgeQuery(Edge(id, "foo", id)),
+        ]
+        for query in queries:
+            self.assertEqual(query.count().to_message().count.inner, query.to_message())
+
+    def test_split_query(self):
+        from indradb.models import _split_query
+
+        ids = tuple(uuid.uuid1() for _ in range(5))
+        query = SpecificVertexQuery(*ids).outbound().t("foo").include().inbound().properties().count()
+        parts = _split_query(query, 2)
+        self.assertEqual(len(parts), 3)
+        self.assertEqual(parts[0], SpecificVertexQuery(*ids[:2]).outbound().t("foo").include().inbound().properties().count())
+        self.assertEqual(parts[2], SpecificVertexQuery(ids[4]).outbound().t("foo").include().inbound().properties().count())
+
+        edges = tuple(Edge(id, "foo", id) for id in ids)
+        self.assertEqual(_split_query(SpecificEdgeQuery(*edges), 4), [SpecificEdgeQuery(*edges[:4]), SpecificEdgeQuery(edges[4])])
+
+        # queries that are small, limited, or not on specific IDs are not split
+        self.assertEqual(_split_query(query, 5), [query])
+        limited = SpecificVertexQuery(*ids).outbound().limit(3).inbound()
+        self.assertEqual(_split_query(limited, 2), [limited])
+        self.assertEqual(_split_query(AllVertexQuery().outbound(), 2), [AllVertexQuery().outbound()])
+
+    def test_equality_and_hash(self):
+        id = uuid.uuid1()
+        edge = Edge(id, "foo", id)
+        pairs = [
+            (AllVertexQuery(), AllVertexQuery()),
+            (AllEdgeQuery().count(), AllEdgeQuery().count()),
+            (SpecificVertexQuery(id).outbound().t("foo"), SpecificVertexQuery(id).outbound().t("foo")),
+            (SpecificEdgeQuery(edge).properties().name("bar"), SpecificEdgeQuery(Edge(id, "foo", id)).properties().name("bar")),
+            (VertexWithPropertyValueQuery("foo", {"a": [1]}), VertexWithPropertyValueQuery("foo", {"a": [1]})),
+        ]
+        for a, b in pairs:
+            self.assertEqual(a, b)
+            self.assertEqual(hash(a), hash(b))
+
+        self.assertNotEqual(AllVertexQuery(), AllEdgeQuery())
+        self.assertNotEqual(VertexWithPropertyPresenceQuery("foo"), EdgeWithPropertyPresenceQuery("foo"))
+        self.assertNotEqual(SpecificVertexQuery(id).outbound(), SpecificVertexQuery(id).inbound())
+        self.assertEqual(len({SpecificVertexQuery(id), SpecificVertexQuery(id), AllVertexQuery()}), 2)
+
+    def test_to_bytes(self):
+        query = SpecificVertexQuery(uuid.uuid1()).outbound().with_property_equal_to("foo", 1)
+        encoded = query.to_bytes()
+        self.assertEqual(proto.Query.FromString(encoded), query.to_message())
+        self.assertIs(query.to_bytes(), encoded)
+        self.assertEqual(proto.Query.FromString(query.to_bytes(JsonCodec())), query.to_message())
+
 class NamedPropertyTestCase(unittest.TestCase):
     def test_from_message(self):
         message = proto.NamedProperty(name=proto.Identifier(value="foo"), value=proto.Json(value=json.dumps({})))
         self.assertEqual(NamedProperty.from_message(message), NamedProperty("foo", {}))
 
+    def test_deferred_value(self):
+        class CountingCodec(JsonCodec):
+            calls = 0
+
+            def loads(self, s):
+                CountingCodec.calls += 1
+                return super().loads(s)
+
+        message = proto.NamedProperty(name=proto.Identifier(value="foo"), value=proto.Json(value="[1, 2]"))
+        prop = NamedProperty.from_message(message, CountingCodec())
+        self.assertEqual(prop.name, "foo")
+        self.assertEqual(CountingCodec.calls, 0)
+        self.assertEqual(prop.value, [1, 2])
+        self.assertEqual(prop.value, [1, 2])
+        self.assertEqual(CountingCodec.calls, 1)
+
+        prop.value = 3
+        self.assertEqual(prop, NamedProperty("foo", 3))
+
+    def test_from_message_with_codec(self):
+        message = proto.NamedProperty(name=proto.Identifier(value="foo"), value=proto.Json(value="[1, 2]"))
+        for codec in (JsonCodec(), OrjsonCodec()):
+            self.assertEqual(NamedProperty.from_message(message, codec), NamedProperty("foo", [1, 2]))
+
 class VertexPropertyTestCase(unittest.TestCase):
     def test_from_message(self):
         id = uuid.uuid1()
@@ -180,3 +291,45 @@ class EdgePropertiesTestCase(unittest.TestCase):
             NamedProperty("first", True),
             NamedProperty("second", False),
         ]))
+
+class ViewTestCase(unittest.TestCase):
+    def test_vertex_view(self):
+        id = uuid.uuid1()
+        view = VertexView(Vertex(id, "foo").to_message())
+        self.assertEqual(view.id, id)
+        self.assertEqual(view.t, "foo")
+        self.assertEqual(view, Vertex(id, "foo"))
+        self.assertEqual(Vertex(id, "foo"), view)
+        self.assertNotEqual(view, Vertex(id, "bar"))
+        self.assertEqual(view.to_model(), Vertex(id, "foo"))
+        self.assertIsInstance(view.to_model(), Vertex)
+
+    def test_edge_view(self):
+        edge = Edge(uuid.uuid1(), "foo", uuid.uuid1())
+        view = EdgeView.from_message(edge.to_message())
+        self.assertEqual(view.outbound_id, edge.outbound_id)
+        self.assertEqual(view.inbound_id, edge.inbound_id)
+        self.assertEqual(view, edge)
+        self.assertEqual(edge, view)
+        self.assertNotEqual(view, Edge(edge.inbound_id, "foo", edge.outbound_id))
+        self.assertEqual(view.to_message(), edge.to_message())
+
+    def test_properties_views(self):
+        id = uuid.uuid1()
+        message = proto.VertexProperties(
+            vertex=Vertex(id, "foo").to_message(),
+            props=[proto.NamedProperty(name=proto.Identifier(value="first"), value=proto.Json(value=json.dumps(True)))],
+        )
+        expected = VertexProperties(Vertex(id, "foo"), [NamedProperty("first", True)])
+        self.assertEqual(VertexPropertiesView(message), expected)
+        self.assertEqual(expected, VertexPropertiesView(message))
+        self.assertEqual(VertexPropertiesView(message).to_model(), expected)
+
+        edge = Edge(uuid.uuid1(), "foo", uuid.uuid1())
+        message = proto.EdgeProperties(
+            edge=edge.to_message(),
+            props=[proto.NamedProperty(name=proto.Identifier(value="first"), value=proto.Json(value=json.dumps(1)))],
+        )
+        expected = EdgeProperties(edge, [NamedProperty("first", 1)])
+        self.assertEqual(EdgePropertiesView(message), expected)
+        self.assertNotEqual(EdgePropertiesView(message), EdgeProperties(edge, []))
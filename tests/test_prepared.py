@@ -0,0 +1,49 @@
+import uuid
+import unittest
+
+from indradb import *
+
+class PreparedQueryTestCase(unittest.TestCase):
+    def assertBindsTo(self, template, expected, **values):
+        bound = PreparedQuery(template, JsonCodec()).bind(**values)
+        self.assertEqual(proto.Query.FromString(bound.to_bytes()), expected.to_message(JsonCodec()))
+        self.assertEqual(bound.to_message(), expected.to_message(JsonCodec()))
+
+    def test_specific_vertex(self):
+        template = SpecificVertexQuery(Param("id")).outbound().t("follows").with_property_equal_to("active", Param("active"))
+        for _ in range(3):
+            id = uuid.uuid4()
+            expected = SpecificVertexQuery(id).outbound().t("follows").with_property_equal_to("active", {"since": 3})
+            self.assertBindsTo(template, expected, id=id, active={"since": 3})
+
+    def test_types_limits_and_names(self):
+        id = uuid.uuid4()
+        template = SpecificVertexQuery(id, Param("other")).inbound().limit(Param("limit")).t(Param("t")).properties().name(Param("name"))
+        other = uuid.uuid4()
+        expected = SpecificVertexQuery(id, other).inbound().limit(200).t("bar").properties().name("baz")
+        self.assertBindsTo(template, expected, other=other, limit=200, t="bar", name="baz")
+        # large values change the size of the enclosing messages
+        expected = SpecificVertexQuery(id, other).inbound().limit(2 ** 32 - 1).t("x" * 300).properties().name("")
+        self.assertBindsTo(template, expected, other=other, limit=2 ** 32 - 1, t="x" * 300, name="")
+
+    def test_edges_and_ranges(self):
+        outbound_id, inbound_id = uuid.uuid4(), uuid.uuid4()
+        template = SpecificEdgeQuery(Edge(Param("o"), Param("t"), Param("i")), Edge(Param("i"), "back", Param("o")))
+        expected = SpecificEdgeQuery(Edge(outbound_id, "foo", inbound_id), Edge(inbound_id, "back", outbound_id))
+        self.assertBindsTo(template, expected, o=outbound_id, t="foo", i=inbound_id)
+
+        template = RangeVertexQuery().start_id(Param("start")).limit(Param("limit")).properties().count()
+        expected = RangeVertexQuery().start_id(outbound_id).limit(10).properties().count()
+        self.assertBindsTo(template, expected, start=outbound_id, limit=10)
+
+    def test_bad_bindings(self):
+        prepared = PreparedQuery(SpecificVertexQuery(Param("id")).outbound().limit(Param("limit")))
+        self.assertEqual(prepared.params, {"id", "limit"})
+        with self.assertRaises(ValueError):
+            prepared.bind(id=uuid.uuid4())
+        with self.assertRaises(ValueError):
+            prepared.bind(id=uuid.uuid4(), limit=1, other=2)
+        with self.assertRaises(ValueError):
+            PreparedQuery(SpecificVertexQuery(Param("x")).outbound().t(Param("x")))
+        with self.assertRaises(ValueError):
+            PreparedQuery(PipeQuery(AllVertexQuery(), Param("direction")))
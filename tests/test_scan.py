@@ -0,0 +1,80 @@
+import os
+import json
+import uuid
+import unittest
+
+from indradb import *
+
+class ScanTestCase(unittest.TestCase):
+    def setUp(self):
+        self.client = Client(os.environ["INDRADB_HOST"])
+        # a type unique to this test, so other vertices can be filtered out
+        self.t = "scan{}".format(uuid.uuid4().hex)
+        self.vertices = [Vertex(uuid.uuid4(), self.t) for _ in range(50)]
+        for vertex in self.vertices:
+            self.client.create_vertex(vertex)
+        self.vertices.sort(key=lambda v: v.id.bytes)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_partition_bounds(self):
+        bounds = partition_bounds(4)
+        self.assertEqual(bounds[0][0], uuid.UUID(int=0))
+        self.assertEqual(bounds[1][0], uuid.UUID("40000000-0000-0000-0000-000000000000"))
+        self.assertEqual(bounds[-1][1], None)
+        self.assertEqual([end for _, end in bounds[:-1]], [start for start, _ in bounds[1:]])
+        with self.assertRaises(ValueError):
+            partition_bounds(0)
+
+    def test_scan_range(self):
+        start, end = self.vertices[10].id, self.vertices[40].id
+        chunks = list(scan_range(self.client, start, end, t=self.t, page_size=7))
+        self.assertEqual([v for chunk in chunks for v in chunk], self.vertices[10:40])
+
+    def test_cursor(self):
+        for prefetch in (True, False):
+            cursor = VertexCursor(self.client, t=self.t, page_size=8, prefetch=prefetch)
+            pages = list(cursor)
+            self.assertEqual([len(page) for page in pages], [8, 8, 8, 8, 8, 8, 2])
+            self.assertEqual([v for page in pages for v in page], self.vertices)
+            self.assertTrue(cursor.done)
+            self.assertEqual(list(cursor), [])
+
+    def test_scan_range_cached(self):
+        client = Client(os.environ["INDRADB_HOST"], cache=ResultCache())
+        try:
+            for end in (None, self.vertices[25].id, None):
+                pages = scan_range(client, end=end, t=self.t, page_size=100)
+                expected = self.vertices if end is None else self.vertices[:25]
+                self.assertEqual([v for page in pages for v in page], expected)
+        finally:
+            client.close()
+
+    def test_cursor_checkpoint(self):
+        cursor = VertexCursor(self.client, end=self.vertices[45].id, t=self.t, page_size=10)
+        pages = iter(cursor)
+        self.assertEqual(next(pages), self.vertices[:10])
+        self.assertEqual(next(pages), self.vertices[10:20])
+        checkpoint = json.loads(json.dumps(cursor.checkpoint()))
+        pages.close()
+
+        # the page being processed when the checkpoint was taken is repeated
+        restored = VertexCursor.restore(self.client, checkpoint, prefetch=False)
+        self.assertEqual([v for page in restored for v in page], self.vertices[10:45])
+        self.assertTrue(VertexCursor.restore(self.client, restored.checkpoint()).done)
+
+    def test_scan_partitions(self):
+        streams = scan_partitions(self.client, partitions=5, t=self.t, page_size=4)
+        self.assertEqual(len(streams), 5)
+        self.assertEqual([v for stream in streams for chunk in stream for v in chunk], self.vertices)
+
+    def test_scan_vertices(self):
+        chunks = list(scan_vertices(self.client, partitions=5, t=self.t, page_size=4, lazy=True))
+        ids = sorted(v.id.bytes for chunk in chunks for v in chunk)
+        self.assertEqual(ids, [v.id.bytes for v in self.vertices])
+
+    def test_early_close(self):
+        chunks = scan_vertices(self.client, partitions=5, t=self.t, page_size=1)
+        next(chunks)
+        chunks.close()
@@ -0,0 +1,120 @@
+import io
+import os
+import uuid
+import unittest
+
+from indradb import *
+
+def _keys(edges):
+    return {(e.outbound_id, e.t, e.inbound_id) for e in edges}
+
+class NeighborhoodTestCase(unittest.TestCase):
+    def setUp(self):
+        self.client = Client(os.environ["INDRADB_HOST"])
+        # a -> b -> c -> d, a -> c, and e -> a through another edge type
+        self.a, self.b, self.c, self.d, self.e = vertices = [Vertex(uuid.uuid4(), "foo") for _ in range(5)]
+        self.edges = [
+            Edge(self.a.id, "follows", self.b.id),
+            Edge(self.b.id, "follows", self.c.id),
+            Edge(self.c.id, "follows", self.d.id),
+            Edge(self.a.id, "follows", self.c.id),
+            Edge(self.e.id, "likes", self.a.id),
+        ]
+        for vertex in vertices:
+            self.client.create_vertex(vertex)
+        for edge in self.edges:
+            self.client.create_edge(edge)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_outbound(self):
+        hood = neighborhood(self.client, self.a.id, 2, batch_size=1)
+        self.assertEqual([set(level) for level in hood.levels], [{self.a.id}, {self.b.id, self.c.id}, {self.d.id}])
+        self.assertEqual(sorted(v.id for v in hood.vertices), sorted(v.id for v in [self.a, self.b, self.c, self.d]))
+        self.assertEqual(_keys(hood.edges), _keys(self.edges[:4]))
+
+        hood = neighborhood(self.client, self.a.id, 1)
+        self.assertEqual(_keys(hood.edges), _keys([self.edges[0], self.edges[3]]))
+
+    def test_zero_hops(self):
+        hood = neighborhood(self.client, [self.a.id], 0)
+        self.assertEqual(hood.vertices, [self.a])
+        self.assertEqual(hood.edges, [])
+
+    def test_direction_and_type(self):
+        hood = neighborhood(self.client, self.a.id, 1, direction=EdgeDirection.INBOUND)
+        self.assertEqual(_keys(hood.edges), _keys([self.edges[4]]))
+        self.assertEqual({v.id for v in hood.vertices}, {self.a.id, self.e.id})
+
+        hood = neighborhood(self.client, self.a.id, 1, direction=None, t="follows")
+        self.assertEqual(_keys(hood.edges), _keys([self.edges[0], self.edges[3]]))
+
+        hood = neighborhood(self.client, self.a.id, 3, direction=None, t=["follows", "likes"])
+        self.assertEqual(_keys(hood.edges), _keys(self.edges))
+
+    def test_max_fanout(self):
+        hood = neighborhood(self.client, self.a.id, 1, max_fanout=1)
+        self.assertEqual(len(hood.levels[1]), 1)
+        self.assertEqual(len(hood.edges), 1)
+        with self.assertRaises(ValueError):
+            neighborhood(self.client, self.a.id, 1, max_fanout=0)
+
+    def test_shortest_path(self):
+        a, b, c, d, e = self.a.id, self.b.id, self.c.id, self.d.id, self.e.id
+        self.assertEqual(shortest_path(self.client, a, d), [self.edges[3], self.edges[2]])
+        self.assertEqual(shortest_path(self.client, a, a), [])
+        self.assertEqual(shortest_path(self.client, d, a, direction=EdgeDirection.INBOUND), [self.edges[2], self.edges[3]])
+        self.assertIsNone(shortest_path(self.client, d, a))
+        self.assertEqual(shortest_path(self.client, d, e, direction=None), [self.edges[2], self.edges[3], self.edges[4]])
+        self.assertIsNone(shortest_path(self.client, e, d, t="follows"))
+        self.assertEqual(len(shortest_path(self.client, e, d, t=["follows", "likes"], batch_size=1)), 3)
+
+    def test_shortest_path_limits(self):
+        self.assertIsNone(shortest_path(self.client, self.a.id, self.d.id, max_depth=1))
+        self.assertEqual(len(shortest_path(self.client, self.a.id, self.d.id, max_depth=2)), 2)
+        with self.assertRaises(TimeoutError):
+            shortest_path(self.client, self.a.id, self.d.id, timeout=0)
+
+    def test_shortest_path_deadline(self):
+        get = self.client.get
+        timeouts = []
+
+        def expired_get(query, lazy=False, timeout=None):
+            timeouts.append(timeout)
+            # as if the level's time ran out while its queries were running
+            return get(query, lazy, timeout=0)
+
+        self.client.get = expired_get
+        with self.assertRaises(TimeoutError):
+            shortest_path(self.client, self.a.id, self.d.id, timeout=60)
+        self.assertTrue(timeouts)
+        self.assertTrue(all(0 <= timeout <= 60 for timeout in timeouts))
+
+    def test_random_walks(self):
+        a, b, c, d = self.a.id, self.b.id, self.c.id, self.d.id
+        walks = list(random_walks(self.client, [a, b], 3, walks_per_start=5, walkers=3, seed=1, batch_size=1))
+        self.assertEqual(len(walks), 10)
+        for walk in walks:
+            self.assertIn(walk[0], (a, b))
+            # every walk ends at d, which has no outbound edges
+            self.assertEqual(walk[-1], d)
+            for source, target in zip(walk, walk[1:]):
+                self.assertIn((source, target), {(a, b), (b, c), (c, d), (a, c)})
+
+        walks = list(random_walks(self.client, [a], 4, direction=None, t="follows", seed=1))
+        self.assertEqual(len(walks[0]), 5)
+
+    def test_random_walk_restarts(self):
+        walks = list(random_walks(self.client, [self.a.id], 20, direction=None, restart=0.5, seed=2))
+        self.assertEqual(len(walks[0]), 21)
+        self.assertGreater(walks[0][2:].count(self.a.id), 0)
+
+        with self.assertRaises(ValueError):
+            next(random_walks(self.client, [self.a.id], 1, restart=1))
+
+    def test_write_walks(self):
+        out = io.StringIO()
+        walks = random_walks(self.client, [self.c.id], 1)
+        self.assertEqual(write_walks(walks, out), 1)
+        self.assertEqual(out.getvalue(), "{} {}\n".format(self.c.id, self.d.id))